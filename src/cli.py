@@ -76,6 +76,12 @@ def cmd_from_sections(args: argparse.Namespace) -> int:
         scope=args.scope,
         dry_run=args.dry_run,
         verbose=args.verbose,
+        llm_batch_mode=getattr(args, "batch", False),
+        embedding_batch_mode=getattr(args, "batch_embeddings", False),
+        quantize_index=not getattr(args, "no_quantize", False),
+        llm_sections_per_call=getattr(args, "sections_per_call", 1),
+        llm_concurrency=getattr(args, "llm_concurrency", 10),
+        llm_semantic_cache=getattr(args, "semantic_cache", False),
     )
     errors = config.validate()
     if not Path(args.ib).exists():
@@ -124,6 +130,7 @@ def cmd_from_sections(args: argparse.Namespace) -> int:
             tmpl_texts = [f"{s.section_id} {s.title} {s.body or ''}" for s in template_sections]
             tmpl_meta = [{"section_id": s.section_id, "title": s.title} for s in template_sections]
             vector_store.add_documents(tmpl_texts, tmpl_meta, source_type="template")
+            vector_store.flush()
             logger.info("Vector store: indexed %d template sections", len(tmpl_texts))
         except ImportError:
             logger.warning("Vector store dependencies not available — skipping vectorization")
@@ -154,8 +161,11 @@ def cmd_from_sections(args: argparse.Namespace) -> int:
         dry_run=config.dry_run,
         pbrer_index=pbrer_index,
         literature_results=literature_results,
+        emit_docx=not getattr(args, "no_docx", False),
+        docx_engine=getattr(args, "docx_engine", "python-docx"),
+        use_cache=not getattr(args, "no_synth_cache", False),
     )
-    logger.info("Filled template: %s, %s", filled_paths["md"], filled_paths["docx"])
+    logger.info("Filled template: %s", ", ".join(str(p) for p in filled_paths.values()))
 
     # Step 5: Validate
     logger.info("Step 5: Running validation")
@@ -194,6 +204,12 @@ def cmd_from_pdf(args: argparse.Namespace) -> int:
         scope=args.scope,
         dry_run=args.dry_run,
         verbose=args.verbose,
+        llm_batch_mode=getattr(args, "batch", False),
+        embedding_batch_mode=getattr(args, "batch_embeddings", False),
+        quantize_index=not getattr(args, "no_quantize", False),
+        llm_sections_per_call=getattr(args, "sections_per_call", 1),
+        llm_concurrency=getattr(args, "llm_concurrency", 10),
+        llm_semantic_cache=getattr(args, "semantic_cache", False),
     )
     errors = config.validate()
     if not config.pdf_path.exists():
@@ -242,6 +258,7 @@ def cmd_from_pdf(args: argparse.Namespace) -> int:
             tmpl_texts = [f"{s.section_id} {s.title} {s.body or ''}" for s in template_sections]
             tmpl_meta = [{"section_id": s.section_id, "title": s.title} for s in template_sections]
             vector_store.add_documents(tmpl_texts, tmpl_meta, source_type="template")
+            vector_store.flush()
             logger.info("Vector store: indexed %d template sections", len(tmpl_texts))
         except ImportError:
             logger.warning("Vector store dependencies not available — skipping vectorization")
@@ -273,8 +290,11 @@ def cmd_from_pdf(args: argparse.Namespace) -> int:
         dry_run=config.dry_run,
         pbrer_index=pbrer_index,
         literature_results=literature_results,
+        emit_docx=not getattr(args, "no_docx", False),
+        docx_engine=getattr(args, "docx_engine", "python-docx"),
+        use_cache=not getattr(args, "no_synth_cache", False),
     )
-    logger.info("Filled template: %s, %s", filled_paths["md"], filled_paths["docx"])
+    logger.info("Filled template: %s", ", ".join(str(p) for p in filled_paths.values()))
 
     # Step 5: Validate
     logger.info("Step 5: Running validation")
@@ -319,7 +339,9 @@ def _load_pbrer_index(args: argparse.Namespace) -> dict[str, str] | None:
 
 
 def _add_common_enhancement_args(parser: argparse.ArgumentParser) -> None:
-    """Add --pbrer, --pbrer-index, --literature, --no-vectors to a subparser."""
+    """Add --pbrer, --pbrer-index, --literature, --no-vectors, --no-quantize, --batch,
+    --sections-per-call, --batch-embeddings, --llm-concurrency, --semantic-cache,
+    --no-synth-cache, --no-docx, --docx-engine to a subparser."""
     parser.add_argument(
         "--pbrer", default=None,
         help="Path to PBRER PDF for auto-extraction (all pages)",
@@ -336,6 +358,45 @@ def _add_common_enhancement_args(parser: argparse.ArgumentParser) -> None:
         "--no-vectors", action="store_true",
         help="Disable vector similarity matching (use keyword fallback only)",
     )
+    parser.add_argument(
+        "--no-quantize", action="store_true",
+        help="Keep full-precision vectors in the vector index (default: 8-bit quantized)",
+    )
+    parser.add_argument(
+        "--batch", action="store_true",
+        help="Submit synthesis calls via the OpenAI Batch API "
+        "(about half the cost, up to 24h turnaround)",
+    )
+    parser.add_argument(
+        "--batch-embeddings", action="store_true",
+        help="Compute vector-store embeddings via the OpenAI Batch API "
+        "(about half the cost, up to 24h turnaround)",
+    )
+    parser.add_argument(
+        "--sections-per-call", type=int, default=1, metavar="N",
+        help="Synthesize up to N sections in a single LLM call (default: 1)",
+    )
+    parser.add_argument(
+        "--llm-concurrency", type=int, default=10, metavar="N",
+        help="Maximum number of synthesis calls in flight at once (default: 10)",
+    )
+    parser.add_argument(
+        "--semantic-cache", action="store_true",
+        help="Reuse cached synthesis responses for near-identical prompts "
+        "(embedding similarity), not only exact matches",
+    )
+    parser.add_argument(
+        "--no-synth-cache", action="store_true",
+        help="Ignore cached synthesis responses and re-synthesize every section",
+    )
+    parser.add_argument(
+        "--no-docx", action="store_true",
+        help="Write only filled_template.md (skip the .docx conversion)",
+    )
+    parser.add_argument(
+        "--docx-engine", choices=["python-docx", "pandoc"], default="python-docx",
+        help="Markdown-to-docx converter for the filled template (default: python-docx)",
+    )
 
 
 def build_parser() -> argparse.ArgumentParser:
@@ -33,6 +33,10 @@ class Config:
     # Vectorization settings
     embedding_model: str = "text-embedding-3-small"
     embedding_dim: int = 1536
+    embedding_batch_mode: bool = False
+    embedding_cache: bool = True
+    ann_index_type: str = "flat"  # "flat" (exact) or "hnsw" (approximate, large corpora)
+    quantize_index: bool = True  # 8-bit vectors once the index is large enough to train
     vector_index_dir: Path = field(default_factory=lambda: Path("data/intermediate/vector_index"))
     chunk_size: int = 500
     chunk_overlap: int = 50
@@ -40,6 +44,13 @@ class Config:
     # OCR settings
     ocr_enabled: bool = True
 
+    # LLM settings
+    llm_batch_mode: bool = False
+    llm_sections_per_call: int = 1
+    llm_concurrency: int = 10
+    llm_cache: bool = True
+    llm_semantic_cache: bool = False
+
     @classmethod
     def from_env(cls, **overrides: object) -> Config:
         """Load config from environment / .env file, with CLI overrides."""
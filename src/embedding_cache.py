@@ -0,0 +1,100 @@
+"""On-disk cache of embedding vectors, keyed by text.
+
+Templates and IB chunks rarely change between runs, so most texts sent to
+the embeddings API were already embedded last time.  Vectors are appended
+to a flat float32 file (read back through ``numpy.memmap``) and a SQLite
+table maps each text hash to its row.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+from pathlib import Path
+
+import numpy as np
+
+from .utils import ensure_dir
+
+_SCHEMA = """\
+CREATE TABLE IF NOT EXISTS rows (
+    hash BLOB PRIMARY KEY,
+    row INTEGER NOT NULL
+)"""
+
+
+class EmbeddingCache:
+    """Text -> embedding cache for :class:`~src.vector_store.VectorStore`.
+
+    Args:
+        directory: Directory for ``emb_cache_<dim>.f32`` and its SQLite index.
+        model: Embedding model name; part of every key.
+        dim: Vector dimension.
+    """
+
+    def __init__(self, directory: Path, model: str, dim: int) -> None:
+        ensure_dir(directory)
+        self.model = model
+        self.dim = dim
+        self._vec_path = directory / f"emb_cache_{dim}.f32"
+        self._vec_path.touch()
+        self._conn = sqlite3.connect(str(directory / f"emb_cache_{dim}.sqlite"))
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+        self._rows = self._vec_path.stat().st_size // (4 * dim)
+        self._mmap: np.memmap | None = None
+
+    def _hash(self, text: str) -> bytes:
+        return hashlib.sha256(f"{self.model}\x1e{text}".encode("utf-8")).digest()
+
+    def _vectors(self) -> np.ndarray:
+        if self._mmap is None or self._mmap.shape[0] != self._rows:
+            self._mmap = np.memmap(
+                self._vec_path, dtype="float32", mode="r", shape=(self._rows, self.dim)
+            )
+        return self._mmap
+
+    def get_many(self, texts: list[str]) -> dict[int, np.ndarray]:
+        """Return ``{position: vector}`` for the texts already cached."""
+        hashes = [self._hash(t) for t in texts]
+        found: dict[bytes, int] = {}
+        # Stay under SQLite's default limit on bound parameters.
+        for i in range(0, len(hashes), 500):
+            chunk = hashes[i : i + 500]
+            placeholders = ",".join("?" * len(chunk))
+            found.update(self._conn.execute(
+                f"SELECT hash, row FROM rows WHERE hash IN ({placeholders})", chunk,
+            ).fetchall())
+        if not found:
+            return {}
+        vectors = self._vectors()
+        return {
+            pos: np.array(vectors[found[h]])
+            for pos, h in enumerate(hashes)
+            if h in found
+        }
+
+    def put_many(self, texts: list[str], vectors: np.ndarray) -> None:
+        """Append *vectors* for *texts*; texts already cached are skipped."""
+        known = set(self.get_many(texts))
+        new = [
+            (pos, self._hash(t)) for pos, t in enumerate(texts)
+            if pos not in known
+        ]
+        # A text repeated within the call is stored once.
+        seen: set[bytes] = set()
+        new = [(pos, h) for pos, h in new if not (h in seen or seen.add(h))]
+        if not new:
+            return
+        block = np.ascontiguousarray(vectors[[pos for pos, _ in new]], dtype="float32")
+        with self._vec_path.open("ab") as f:
+            f.write(block.tobytes())
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO rows (hash, row) VALUES (?, ?)",
+            [(h, self._rows + i) for i, (_, h) in enumerate(new)],
+        )
+        self._conn.commit()
+        self._rows += len(new)
+
+    def close(self) -> None:
+        self._conn.close()
@@ -8,8 +8,10 @@ Includes text cleaning to strip boilerplate from extracted PDF content.
 from __future__ import annotations
 
 import re
+import sys
 from dataclasses import dataclass
-from typing import Optional, Tuple
+from functools import lru_cache
+from typing import Iterable, Iterator, Optional, Tuple
 
 # ---------------------------------------------------------------------------
 # Source text cleaning — strip boilerplate from extracted PDF content
@@ -57,15 +59,6 @@ _IB_SECTION_RE = re.compile(
     re.IGNORECASE,
 )
 
-# Regex for "IB Table X" references.
-_IB_TABLE_RE = re.compile(
-    r"^\s*IB\s*Table\s*(\d+)",
-    re.IGNORECASE,
-)
-
-# Regex for bare "IB" (no section number).
-_IB_BARE_RE = re.compile(r"^\s*IB\s*$", re.IGNORECASE)
-
 # Regex for PBRER references with an optional "Section(s)" keyword and a dotted number.
 _PBRER_SECTION_RE = re.compile(
     r"^\s*PBRER\s*(?:Sections?\s*)?(\d+(?:\.\d+)*)\s*(?:\(.*\))?\s*$",
@@ -82,14 +75,21 @@ _COMPOUND_PBRER_RE = re.compile(
     re.IGNORECASE,
 )
 
+# Separators between the numbers of a compound reference, and one number.
+_COMPOUND_SPLIT_RE = re.compile(r"[,&/]|\band\b")
+_SECTION_NUMBER_RE = re.compile(r"^\d+(?:\.\d+)*$")
+
+# Parenthetical descriptions, e.g. "(Pharmacology/MoA)".
+_PAREN_RE = re.compile(r"\([^)]*\)")
+
 # Known external source keywords (substring-matched, case-insensitive).
-_EXTERNAL_KEYWORDS = [
+_EXTERNAL_KEYWORDS = (
     "uptodate",
     "medline",
     "embase",
     "company safety database",
     "signal assessment",
-]
+)
 
 
 def _expand_compound_refs(ref: str) -> list[str]:
@@ -104,43 +104,54 @@ def _expand_compound_refs(ref: str) -> list[str]:
     compound reference (i.e. has only one section number), returns
     ``[ref]`` unchanged.
     """
+    return list(_expand_compound_refs_cached(ref))
+
+
+@lru_cache(maxsize=1024)
+def _expand_compound_refs_cached(ref: str) -> tuple[str, ...]:
+    """Memoized body of ``_expand_compound_refs``; a tuple so callers cannot mutate it."""
+    # Without a separator there is at most one number: nothing to expand.
+    if "," not in ref and "&" not in ref and "/" not in ref and "and" not in ref:
+        return (ref,)
+
     stripped = ref.strip()
 
     # Strip parenthetical descriptions for parsing
-    cleaned = re.sub(r"\([^)]*\)", "", stripped).strip()
+    cleaned = _PAREN_RE.sub("", stripped).strip()
 
     # Check for IB compound pattern
     m = _COMPOUND_IB_RE.match(cleaned)
     if m:
         nums_str = m.group(1)
         # Split on comma, ampersand, slash, or "and"
-        nums = re.split(r"[,&/]|\band\b", nums_str)
+        nums = _COMPOUND_SPLIT_RE.split(nums_str)
         result = []
         for n in nums:
             n = n.strip()
-            if re.match(r"^\d+(?:\.\d+)*$", n):
+            if _SECTION_NUMBER_RE.match(n):
                 result.append(f"IB Section {n}")
         # Only expand if we found multiple numbers
         if len(result) > 1:
-            return result
+            return tuple(result)
 
     # Check for PBRER compound pattern
     m = _COMPOUND_PBRER_RE.match(cleaned)
     if m:
         nums_str = m.group(1)
-        nums = re.split(r"[,&/]|\band\b", nums_str)
+        nums = _COMPOUND_SPLIT_RE.split(nums_str)
         result = []
         for n in nums:
             n = n.strip()
-            if re.match(r"^\d+(?:\.\d+)*$", n):
+            if _SECTION_NUMBER_RE.match(n):
                 result.append(f"PBRER {n}")
         # Only expand if we found multiple numbers
         if len(result) > 1:
-            return result
+            return tuple(result)
 
-    return [ref]
+    return (ref,)
 
 
+@lru_cache(maxsize=1024)
 def classify_source(source: str) -> Tuple[str, Optional[str]]:
     """Classify a required_source string into a type and optional section number.
 
@@ -148,34 +159,47 @@ def classify_source(source: str) -> Tuple[str, Optional[str]]:
         A ``(source_type, section_number)`` tuple where *source_type* is one of
         ``"ib"``, ``"ib_table"``, ``"pbrer"``, ``"external"``, or ``"unknown"``; and
         *section_number* is a dotted-decimal string for IB/PBRER refs,
-        a table number string for ``"ib_table"``, or ``None``.
+        a table number string for ``"ib_table"``, or ``None``.  Section
+        numbers are interned, like the ids of the models they are looked
+        up against.
     """
-    # Try IB with section number first.
-    m = _IB_SECTION_RE.match(source)
-    if m:
-        return ("ib", m.group(1))
-
-    # IB Table reference (e.g. "IB Table 30").
-    m = _IB_TABLE_RE.match(source)
-    if m:
-        return ("ib_table", m.group(1))
-
-    # Bare IB.
-    if _IB_BARE_RE.match(source):
-        return ("ib", None)
+    # Every IB / PBRER pattern is anchored on its keyword, so a prefix
+    # test picks the one family of regexes that can match.
+    lower = source.strip().lower()
+
+    if lower.startswith("ib"):
+        rest = lower[2:].lstrip()
+
+        # IB Table reference (e.g. "IB Table 30").  The shape is rigid
+        # enough that plain string checks replace a regex here.
+        if rest.startswith("table"):
+            tail = rest[5:].lstrip()
+            end = 0
+            while end < len(tail) and tail[end].isdecimal():
+                end += 1
+            if end:
+                return ("ib_table", sys.intern(tail[:end]))
+
+        # Bare IB.
+        elif not rest:
+            return ("ib", None)
+
+        # IB with section number.
+        else:
+            m = _IB_SECTION_RE.match(source)
+            if m:
+                return ("ib", sys.intern(m.group(1)))
 
-    # PBRER with section number.
-    m = _PBRER_SECTION_RE.match(source)
-    if m:
-        return ("pbrer", m.group(1))
+    elif lower.startswith("pbrer"):
+        # PBRER with section number.
+        m = _PBRER_SECTION_RE.match(source)
+        if m:
+            return ("pbrer", sys.intern(m.group(1)))
 
-    # Bare PBRER or PBRER with unstructured trailing text.
-    stripped = source.strip()
-    if stripped.lower().startswith("pbrer"):
+        # Bare PBRER or PBRER with unstructured trailing text.
         return ("pbrer", None)
 
     # Known external sources (substring match for flexibility).
-    lower = stripped.lower()
     for kw in _EXTERNAL_KEYWORDS:
         if kw in lower:
             return ("external", None)
@@ -183,9 +207,54 @@ def classify_source(source: str) -> Tuple[str, Optional[str]]:
     return ("unknown", None)
 
 
-@dataclass
+# Placeholder texts for references that cannot be resolved; filled with
+# str.format (``num`` = section/table number, ``ref`` = stripped ref).
+_IB_TABLE_MISSING = (
+    "[ADDITIONAL DATA NEEDED: IB Table {num} was referenced but could not be "
+    "located in the extracted IB content.]"
+)
+_IB_SECTION_MISSING = (
+    "[ADDITIONAL DATA NEEDED: IB Section {num} was referenced but not found in "
+    "the extracted IB index. Provide the content from Investigator's Brochure "
+    "section {num}.]"
+)
+_IB_BARE_MISSING = (
+    "[ADDITIONAL DATA NEEDED: The Investigator's Brochure was referenced without "
+    "a specific section number. Review the IB and provide the relevant content "
+    "for this section.]"
+)
+_PBRER_SECTION_MISSING = (
+    "[ADDITIONAL DATA NEEDED: PBRER Section {num} was referenced but could not "
+    "be resolved. Provide the PBRER PDF via --pbrer flag or manually supply the "
+    "content from PBRER section {num}.]"
+)
+_PBRER_REF_MISSING = (
+    "[ADDITIONAL DATA NEEDED: {ref} — provide the PBRER PDF via --pbrer flag or "
+    "manually supply the relevant PBRER content for this section.]"
+)
+_EXTERNAL_NOT_IN_INDEX = (
+    "[ADDITIONAL DATA NEEDED: External source '{ref}' was referenced but no "
+    "matching entry was found in the literature index. Provide this data via "
+    "--literature flag with a JSON file containing a '{ref}' key.]"
+)
+_EXTERNAL_NO_INDEX = (
+    "[ADDITIONAL DATA NEEDED: External source '{ref}' was referenced. Provide "
+    "literature data via --literature flag with a JSON file containing a "
+    "'{ref}' key.]"
+)
+_UNKNOWN_SOURCE = (
+    "[ADDITIONAL DATA NEEDED: Source '{ref}' could not be classified or "
+    "resolved. Manually provide the content for this reference.]"
+)
+
+
+@dataclass(slots=True, frozen=True)
 class ResolvedSource:
-    """Result of resolving a single source reference."""
+    """Result of resolving a single source reference.
+
+    Frozen because ``resolve_sources_bulk`` hands the same instance to
+    every section citing the reference.
+    """
 
     original_ref: str
     source_type: str
@@ -194,6 +263,194 @@ class ResolvedSource:
     found: bool
 
 
+def _resolve_ib_table(
+    ref: str,
+    table_num: Optional[str],
+    ib_index: dict[str, str],
+    pbrer_index: dict[str, str] | None,
+    literature_results: dict[str, str] | None,
+) -> ResolvedSource:
+    # Search the IB index for content containing "Table {num}"
+    for content in ib_index.values():
+        if re.search(rf"\bTable\s*{re.escape(table_num)}\b", content):
+            return ResolvedSource(
+                original_ref=ref,
+                source_type="ib",
+                section_num=None,
+                content=clean_source_text(content),
+                found=True,
+            )
+    return ResolvedSource(
+        original_ref=ref,
+        source_type="ib",
+        section_num=None,
+        content=_IB_TABLE_MISSING.format(num=table_num),
+        found=False,
+    )
+
+
+def _resolve_ib(
+    ref: str,
+    section_num: Optional[str],
+    ib_index: dict[str, str],
+    pbrer_index: dict[str, str] | None,
+    literature_results: dict[str, str] | None,
+) -> ResolvedSource:
+    if section_num is None:
+        return ResolvedSource(
+            original_ref=ref,
+            source_type="ib",
+            section_num=None,
+            content=_IB_BARE_MISSING,
+            found=False,
+        )
+    text = ib_index.get(section_num)
+    if text is not None:
+        return ResolvedSource(
+            original_ref=ref,
+            source_type="ib",
+            section_num=section_num,
+            content=clean_source_text(text),
+            found=True,
+        )
+    return ResolvedSource(
+        original_ref=ref,
+        source_type="ib",
+        section_num=section_num,
+        content=_IB_SECTION_MISSING.format(num=section_num),
+        found=False,
+    )
+
+
+def _resolve_pbrer(
+    ref: str,
+    section_num: Optional[str],
+    ib_index: dict[str, str],
+    pbrer_index: dict[str, str] | None,
+    literature_results: dict[str, str] | None,
+) -> ResolvedSource:
+    if pbrer_index is not None and section_num is not None:
+        text = pbrer_index.get(section_num)
+        if text is not None:
+            return ResolvedSource(
+                original_ref=ref,
+                source_type="pbrer",
+                section_num=section_num,
+                content=clean_source_text(text),
+                found=True,
+            )
+    # PBRER not resolved — produce descriptive placeholder
+    if section_num:
+        placeholder = _PBRER_SECTION_MISSING.format(num=section_num)
+    else:
+        placeholder = _PBRER_REF_MISSING.format(ref=ref.strip())
+    return ResolvedSource(
+        original_ref=ref,
+        source_type="pbrer",
+        section_num=section_num,
+        content=placeholder,
+        found=False,
+    )
+
+
+def _resolve_external(
+    ref: str,
+    section_num: Optional[str],
+    ib_index: dict[str, str],
+    pbrer_index: dict[str, str] | None,
+    literature_results: dict[str, str] | None,
+) -> ResolvedSource:
+    if not literature_results:
+        return ResolvedSource(
+            original_ref=ref,
+            source_type="external",
+            section_num=None,
+            content=_EXTERNAL_NO_INDEX.format(ref=ref.strip()),
+            found=False,
+        )
+    # Try to match the reference against literature keys (already
+    # lowercased by ``_canonicalize_index``).
+    ref_lower = ref.strip().lower()
+    for key, content in literature_results.items():
+        if key in ref_lower or ref_lower in key:
+            return ResolvedSource(
+                original_ref=ref,
+                source_type="external",
+                section_num=None,
+                content=content,
+                found=True,
+            )
+    return ResolvedSource(
+        original_ref=ref,
+        source_type="external",
+        section_num=None,
+        content=_EXTERNAL_NOT_IN_INDEX.format(ref=ref.strip()),
+        found=False,
+    )
+
+
+def _resolve_unknown(
+    ref: str,
+    section_num: Optional[str],
+    ib_index: dict[str, str],
+    pbrer_index: dict[str, str] | None,
+    literature_results: dict[str, str] | None,
+) -> ResolvedSource:
+    # Unknown source type — provide descriptive placeholder.
+    return ResolvedSource(
+        original_ref=ref,
+        source_type="unknown",
+        section_num=None,
+        content=_UNKNOWN_SOURCE.format(ref=ref.strip()),
+        found=False,
+    )
+
+
+def _canonicalize_index(index: dict[str, str]) -> dict[str, str]:
+    """Return *index* keyed by lowercased keys, for case-insensitive matching.
+
+    Keys that collide once lowercased keep the first entry, matching the
+    first-match-wins scan in ``_resolve_external``.
+    """
+    canonical: dict[str, str] = {}
+    for key, content in index.items():
+        canonical.setdefault(key.lower(), content)
+    return canonical
+
+
+# classify_source type -> resolver; each takes
+# (ref, section_num, ib_index, pbrer_index, literature_results).
+_RESOLVERS = {
+    "ib_table": _resolve_ib_table,
+    "ib": _resolve_ib,
+    "pbrer": _resolve_pbrer,
+    "external": _resolve_external,
+    "unknown": _resolve_unknown,
+}
+
+
+def iter_resolve_sources(
+    required_sources: Iterable[str],
+    ib_index: dict[str, str],
+    pbrer_index: dict[str, str] | None = None,
+    literature_results: dict[str, str] | None = None,
+) -> Iterator[ResolvedSource]:
+    """Yield the resolution of each source reference as it is produced.
+
+    Streaming counterpart of ``resolve_sources``; compound references
+    yield one ``ResolvedSource`` per expanded reference.
+    """
+    if literature_results:
+        literature_results = _canonicalize_index(literature_results)
+
+    for ref in required_sources:
+        # Expand compound references (e.g. "IB Sections 1.2, 3.2" → two refs)
+        for single in _expand_compound_refs_cached(ref):
+            source_type, section_num = classify_source(single)
+            resolver = _RESOLVERS[source_type]
+            yield resolver(single, section_num, ib_index, pbrer_index, literature_results)
+
+
 def resolve_sources(
     required_sources: list[str],
     ib_index: dict[str, str],
@@ -212,191 +469,35 @@ def resolve_sources(
     preserve backward compatibility — existing callers that pass only
     ``ib_index`` will continue to work unchanged.
     """
-    if not required_sources:
-        return []
+    return list(iter_resolve_sources(
+        required_sources, ib_index, pbrer_index, literature_results,
+    ))
 
-    # Expand compound references (e.g. "IB Sections 1.2, 3.2" → two refs)
-    expanded: list[str] = []
-    for ref in required_sources:
-        expanded.extend(_expand_compound_refs(ref))
-
-    results: list[ResolvedSource] = []
-    for ref in expanded:
-        source_type, section_num = classify_source(ref)
-
-        if source_type == "ib_table":
-            # Search the IB index for content containing "Table {num}"
-            table_num = section_num
-            found_content = None
-            for sec_num, content in ib_index.items():
-                if re.search(rf"\bTable\s*{re.escape(table_num)}\b", content):
-                    found_content = content
-                    break
-            if found_content:
-                results.append(
-                    ResolvedSource(
-                        original_ref=ref,
-                        source_type="ib",
-                        section_num=None,
-                        content=clean_source_text(found_content),
-                        found=True,
-                    )
-                )
-            else:
-                results.append(
-                    ResolvedSource(
-                        original_ref=ref,
-                        source_type="ib",
-                        section_num=None,
-                        content=(
-                            f"[ADDITIONAL DATA NEEDED: IB Table {table_num} "
-                            f"was referenced but could not be located in the "
-                            f"extracted IB content.]"
-                        ),
-                        found=False,
-                    )
-                )
-
-        elif source_type == "ib":
-            if section_num is not None:
-                text = ib_index.get(section_num)
-                if text is not None:
-                    results.append(
-                        ResolvedSource(
-                            original_ref=ref,
-                            source_type=source_type,
-                            section_num=section_num,
-                            content=clean_source_text(text),
-                            found=True,
-                        )
-                    )
-                else:
-                    results.append(
-                        ResolvedSource(
-                            original_ref=ref,
-                            source_type=source_type,
-                            section_num=section_num,
-                            content=(
-                                f"[ADDITIONAL DATA NEEDED: IB Section {section_num} "
-                                f"was referenced but not found in the extracted IB index. "
-                                f"Provide the content from Investigator's Brochure section {section_num}.]"
-                            ),
-                            found=False,
-                        )
-                    )
-            else:
-                results.append(
-                    ResolvedSource(
-                        original_ref=ref,
-                        source_type=source_type,
-                        section_num=None,
-                        content=(
-                            "[ADDITIONAL DATA NEEDED: The Investigator's Brochure was "
-                            "referenced without a specific section number. Review the IB "
-                            "and provide the relevant content for this section.]"
-                        ),
-                        found=False,
-                    )
-                )
-
-        elif source_type == "pbrer":
-            if pbrer_index is not None and section_num is not None:
-                text = pbrer_index.get(section_num)
-                if text is not None:
-                    results.append(
-                        ResolvedSource(
-                            original_ref=ref,
-                            source_type=source_type,
-                            section_num=section_num,
-                            content=clean_source_text(text),
-                            found=True,
-                        )
-                    )
-                    continue
-            # PBRER not resolved — produce descriptive placeholder
-            if section_num:
-                placeholder = (
-                    f"[ADDITIONAL DATA NEEDED: PBRER Section {section_num} "
-                    f"was referenced but could not be resolved. Provide the "
-                    f"PBRER PDF via --pbrer flag or manually supply the content "
-                    f"from PBRER section {section_num}.]"
-                )
-            else:
-                placeholder = (
-                    f"[ADDITIONAL DATA NEEDED: {ref.strip()} — provide the "
-                    f"PBRER PDF via --pbrer flag or manually supply the "
-                    f"relevant PBRER content for this section.]"
-                )
-            results.append(
-                ResolvedSource(
-                    original_ref=ref,
-                    source_type=source_type,
-                    section_num=section_num,
-                    content=placeholder,
-                    found=False,
-                )
-            )
 
-        elif source_type == "external":
-            if literature_results:
-                # Try to match the reference against literature keys
-                ref_lower = ref.strip().lower()
-                for key, content in literature_results.items():
-                    if key.lower() in ref_lower or ref_lower in key.lower():
-                        results.append(
-                            ResolvedSource(
-                                original_ref=ref,
-                                source_type=source_type,
-                                section_num=None,
-                                content=content,
-                                found=True,
-                            )
-                        )
-                        break
-                else:
-                    results.append(
-                        ResolvedSource(
-                            original_ref=ref,
-                            source_type=source_type,
-                            section_num=None,
-                            content=(
-                                f"[ADDITIONAL DATA NEEDED: External source '{ref.strip()}' "
-                                f"was referenced but no matching entry was found in the "
-                                f"literature index. Provide this data via --literature flag "
-                                f"with a JSON file containing a '{ref.strip()}' key.]"
-                            ),
-                            found=False,
-                        )
-                    )
-            else:
-                results.append(
-                    ResolvedSource(
-                        original_ref=ref,
-                        source_type=source_type,
-                        section_num=None,
-                        content=(
-                            f"[ADDITIONAL DATA NEEDED: External source '{ref.strip()}' "
-                            f"was referenced. Provide literature data via --literature "
-                            f"flag with a JSON file containing a '{ref.strip()}' key.]"
-                        ),
-                        found=False,
-                    )
-                )
-
-        else:
-            # Unknown source type — provide descriptive placeholder.
-            results.append(
-                ResolvedSource(
-                    original_ref=ref,
-                    source_type=source_type,
-                    section_num=None,
-                    content=(
-                        f"[ADDITIONAL DATA NEEDED: Source '{ref.strip()}' could not "
-                        f"be classified or resolved. Manually provide the content "
-                        f"for this reference.]"
-                    ),
-                    found=False,
-                )
-            )
+def resolve_sources_bulk(
+    refs: Iterable[str],
+    ib_index: dict[str, str],
+    pbrer_index: dict[str, str] | None = None,
+    literature_results: dict[str, str] | None = None,
+) -> dict[str, list[ResolvedSource]]:
+    """Resolve many source references in one pass over the indices.
 
-    return results
+    Returns ``{ref: [ResolvedSource, ...]}`` for every distinct *ref*, in
+    the same form ``resolve_sources([ref], ...)`` would return.  Compound
+    refs are expanded first, and each individual reference is resolved
+    only once even when several refs (or sections) share it.
+    """
+    expanded_by_ref = {ref: _expand_compound_refs(ref) for ref in dict.fromkeys(refs)}
+    unique = list(dict.fromkeys(
+        single for singles in expanded_by_ref.values() for single in singles
+    ))
+    # Expanded refs do not expand further, so results align one-to-one.
+    by_single = dict(zip(
+        unique,
+        iter_resolve_sources(unique, ib_index, pbrer_index, literature_results),
+        strict=True,
+    ))
+    return {
+        ref: [by_single[single] for single in singles]
+        for ref, singles in expanded_by_ref.items()
+    }
@@ -0,0 +1,195 @@
+"""On-disk cache of LLM responses, keyed by prompt.
+
+Re-running the pipeline on an unchanged template and sources sends the
+same prompts again; with temperature 0 the responses are reusable.  The
+cache has two tiers:
+
+* exact — SHA-256 of (model, system prompt, user prompt);
+* semantic (optional) — cosine similarity between user-prompt embeddings,
+  for near-duplicate prompts that share a model, system prompt and
+  section.  Prompts for different sections never match semantically, so
+  sections with near-identical source material keep their own text.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+
+from .utils import ensure_dir, logger
+
+EmbedFn = Callable[[str], np.ndarray]
+
+_SEP = "\x1e"
+
+_SCHEMA = """\
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    scope TEXT NOT NULL,
+    response TEXT NOT NULL,
+    embedding BLOB
+)"""
+
+
+def _sha256(*parts: str) -> str:
+    return hashlib.sha256(_SEP.join(parts).encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """SQLite-backed response cache for :class:`~src.openai_client.LLMClient`.
+
+    Args:
+        path: SQLite database file (created if missing).
+        model: Model name; part of every key so switching models misses.
+        embed_fn: Optional text -> vector function.  When given, misses on
+            the exact tier fall back to the most similar cached prompt.
+        similarity_threshold: Minimum cosine similarity for a semantic hit.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        model: str,
+        embed_fn: EmbedFn | None = None,
+        similarity_threshold: float = 0.97,
+    ) -> None:
+        ensure_dir(path.parent)
+        self.model = model
+        self.embed_fn = embed_fn
+        self.similarity_threshold = similarity_threshold
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+        # scope -> (keys, L2-normalized embedding matrix), loaded on first use
+        self._vectors: dict[str, tuple[list[str], np.ndarray]] = {}
+
+    def _scope(self, system_prompt: str, section_id: str) -> str:
+        return _sha256(self.model, system_prompt, section_id)
+
+    def _key(self, system_prompt: str, user_prompt: str) -> str:
+        return _sha256(self.model, system_prompt, user_prompt)
+
+    def _embed(self, user_prompt: str) -> np.ndarray | None:
+        """L2-normalized embedding of *user_prompt*, or ``None`` if embedding fails.
+
+        Called without the lock held: ``embed_fn`` is usually a remote
+        call with retries.  A failure only costs the semantic tier.
+        """
+        try:
+            vec = np.asarray(self.embed_fn(user_prompt), dtype="float32").ravel()
+        except Exception as e:
+            logger.warning("Semantic cache embedding failed: %s — exact lookup only", e)
+            return None
+        norm = float(np.linalg.norm(vec))
+        return vec / norm if norm > 0 else vec
+
+    def _load_vectors(self, scope: str) -> tuple[list[str], np.ndarray]:
+        if scope not in self._vectors:
+            rows = self._conn.execute(
+                "SELECT key, embedding FROM responses WHERE scope = ? AND embedding IS NOT NULL",
+                (scope,),
+            ).fetchall()
+            keys = [key for key, _ in rows]
+            matrix = (
+                np.vstack([np.frombuffer(blob, dtype="float32") for _, blob in rows])
+                if rows else np.empty((0, 0), dtype="float32")
+            )
+            self._vectors[scope] = (keys, matrix)
+        return self._vectors[scope]
+
+    def get(self, system_prompt: str, user_prompt: str, section_id: str = "") -> str | None:
+        """Return a cached response for the prompt pair, or ``None``.
+
+        Semantic lookups only consider responses stored with the same
+        *section_id*.
+        """
+        return self.lookup(system_prompt, user_prompt, section_id)[0]
+
+    def lookup(
+        self, system_prompt: str, user_prompt: str, section_id: str = "",
+    ) -> tuple[str | None, np.ndarray | None]:
+        """Like :meth:`get`, but also return the prompt embedding.
+
+        The embedding is computed on an exact-tier miss when the semantic
+        tier is on (``None`` otherwise); pass it to :meth:`set` so the
+        prompt is embedded once.
+        """
+        key = self._key(system_prompt, user_prompt)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response FROM responses WHERE key = ?", (key,),
+            ).fetchone()
+            if row is not None:
+                return row[0], None
+            if self.embed_fn is None:
+                return None, None
+            keys, matrix = self._load_vectors(self._scope(system_prompt, section_id))
+
+        query = self._embed(user_prompt)
+        if query is None or not keys or matrix.shape[1] != query.shape[0]:
+            return None, query
+        scores = matrix @ query
+        best = int(np.argmax(scores))
+        if scores[best] < self.similarity_threshold:
+            return None, query
+        logger.debug("Semantic cache hit (similarity %.3f)", scores[best])
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response FROM responses WHERE key = ?", (keys[best],),
+            ).fetchone()
+        return (row[0] if row else None), query
+
+    def set(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        response: str,
+        section_id: str = "",
+        embedding: np.ndarray | None = None,
+    ) -> None:
+        """Store *response* for the prompt pair under *section_id*.
+
+        *embedding* is the vector returned by :meth:`lookup`; without it
+        the prompt is embedded here.  If embedding fails the response is
+        still stored, for exact lookups only.
+        """
+        key = self._key(system_prompt, user_prompt)
+        scope = self._scope(system_prompt, section_id)
+        vec = embedding
+        if vec is None and self.embed_fn is not None:
+            vec = self._embed(user_prompt)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, scope, response, embedding) "
+                "VALUES (?, ?, ?, ?)",
+                (key, scope, response, vec.tobytes() if vec is not None else None),
+            )
+            self._conn.commit()
+            if vec is not None and scope in self._vectors:
+                keys, matrix = self._vectors[scope]
+                if key not in keys:
+                    matrix = np.vstack([matrix, vec]) if keys else vec[np.newaxis, :]
+                    self._vectors[scope] = (keys + [key], matrix)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def openai_embedder(client: object, model: str) -> EmbedFn:
+    """Return an :data:`EmbedFn` that embeds text with the OpenAI embeddings API."""
+    # Imported here: openai_client imports this module.
+    from .openai_client import retry_transient
+
+    @retry_transient
+    def embed(text: str) -> np.ndarray:
+        response = client.embeddings.create(input=[text[:8000]], model=model)
+        return np.asarray(response.data[0].embedding, dtype="float32")
+
+    return embed
@@ -2,13 +2,20 @@
 
 from __future__ import annotations
 
-from pydantic import BaseModel, Field
+import sys
+from typing import Annotated
+
+from pydantic import AfterValidator, BaseModel, ConfigDict, Field
+
+# Section ids are used as dict keys throughout the pipeline; interning
+# makes equal ids share one object, so lookups compare by identity.
+InternedStr = Annotated[str, AfterValidator(sys.intern)]
 
 
 class TemplateSection(BaseModel):
     """A single section parsed from the regulatory template."""
 
-    section_id: str = Field(description="Section number or identifier (e.g. '2.1.1')")
+    section_id: InternedStr = Field(description="Section number or identifier (e.g. '2.1.1')")
     title: str = Field(description="Section title")
     body: str = Field(default="", description="Full section body text")
     required_sources: list[str] = Field(
@@ -30,7 +37,9 @@ class TemplateSection(BaseModel):
 class MappingTableEntry(BaseModel):
     """One row from the template's mapping table at the top of the document."""
 
-    dsr_section_id: str = Field(description="DSR section number (e.g. '1.2.1')")
+    model_config = ConfigDict(frozen=True)
+
+    dsr_section_id: InternedStr = Field(description="DSR section number (e.g. '1.2.1')")
     dsr_title: str = Field(default="", description="DSR section title")
     source_refs: list[str] = Field(
         default_factory=list,
@@ -41,7 +50,7 @@ class MappingTableEntry(BaseModel):
 class DSRSection(BaseModel):
     """A section from the DSR (either pre-split .md or PDF-extracted)."""
 
-    section_num: str = Field(description="Dotted-decimal section number")
+    section_num: InternedStr = Field(description="Dotted-decimal section number")
     title: str = Field(description="Section title")
     heading_full: str = Field(default="", description="Full heading line")
     page_start: int = Field(default=0)
@@ -53,6 +62,8 @@ class DSRSection(BaseModel):
 class SectionMapping(BaseModel):
     """A mapping between one DSR section and one template section."""
 
+    model_config = ConfigDict(frozen=True)
+
     dsr_section: str
     dsr_title: str
     dsr_file: str = ""
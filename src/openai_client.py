@@ -2,39 +2,110 @@
 
 from __future__ import annotations
 
+import hashlib
+import io
 import json
+import threading
 import time
+from functools import lru_cache
 from pathlib import Path
 
-from openai import OpenAI
-from tenacity import retry, stop_after_attempt, wait_exponential
+from openai import (
+    APIConnectionError,
+    APITimeoutError,
+    InternalServerError,
+    OpenAI,
+    RateLimitError,
+)
+from tenacity import (
+    retry,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_random_exponential,
+)
 
 from .config import Config
+from .llm_cache import LLMCache, openai_embedder
 from .utils import ensure_dir, logger
 
+# Per-request timeout (seconds) for the OpenAI client.
+REQUEST_TIMEOUT = 60.0
+
+# Longest wait (seconds) for a submitted batch: its 24h completion window
+# plus an hour of slack for the provider to report it expired.
+BATCH_TIMEOUT = 25 * 3600.0
+
+# Transient errors worth retrying; anything else (bad request, auth) fails fast.
+_RETRYABLE_ERRORS = (RateLimitError, APIConnectionError, APITimeoutError, InternalServerError)
+
+# Retry policy shared by every OpenAI request (chat and embeddings):
+# jittered exponential backoff, so concurrent callers do not retry in step.
+retry_transient = retry(
+    stop=stop_after_attempt(5),
+    wait=wait_random_exponential(min=1, max=30),
+    retry=retry_if_exception_type(_RETRYABLE_ERRORS),
+    reraise=True,
+)
+
+
+@retry_transient
+def _retrieve_batch(client: OpenAI, batch_id: str):
+    """Fetch a batch's status, retrying transient errors."""
+    return client.batches.retrieve(batch_id)
+
+
+@retry_transient
+def _file_text(client: OpenAI, file_id: str) -> str:
+    """Download a file's contents, retrying transient errors."""
+    return client.files.content(file_id).text
+
+
+@lru_cache(maxsize=32)
+def prompt_fingerprint(system_prompt: str) -> str:
+    """Stable short hash of a system prompt, computed once per distinct prompt."""
+    return hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()[:32]
+
 
 class LLMClient:
     """Thin wrapper around the OpenAI chat completions API."""
 
     def __init__(self, config: Config) -> None:
         self.config = config
-        self.client = OpenAI(api_key=config.openai_api_key)
+        self.client = OpenAI(api_key=config.openai_api_key, timeout=REQUEST_TIMEOUT)
         self.model = config.model
         self._log_dir = ensure_dir(config.intermediate_dir / "api_calls")
         self._call_count = 0
+        self._count_lock = threading.Lock()
+        self.batch_mode = config.llm_batch_mode
+        self.sections_per_call = config.llm_sections_per_call
+        self.concurrency = max(1, config.llm_concurrency)
+        # custom_ids of the last dry-run submit_batch, echoed by wait_batch
+        self._dry_run_batch: list[str] = []
+        self.cache: LLMCache | None = None
+        if config.llm_cache and not config.dry_run:
+            self.cache = LLMCache(
+                config.intermediate_dir / "llm_cache.sqlite",
+                model=self.model,
+                embed_fn=(
+                    openai_embedder(self.client, config.embedding_model)
+                    if config.llm_semantic_cache else None
+                ),
+            )
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=30),
-        reraise=True,
-    )
+    @retry_transient
     def _raw_chat(
         self,
         messages: list[dict[str, str]],
         json_mode: bool = True,
         temperature: float = 0.0,
+        prompt_cache_key: str | None = None,
     ) -> str:
-        """Make a single chat completion call with retry."""
+        """Make a single chat completion call, retrying transient errors.
+
+        Rate limits, connection errors, timeouts and 5xx responses are
+        retried with jittered exponential backoff; callers only see the exception once
+        retries are exhausted.
+        """
         kwargs: dict = {
             "model": self.model,
             "messages": messages,
@@ -42,8 +113,20 @@ class LLMClient:
         }
         if json_mode:
             kwargs["response_format"] = {"type": "json_object"}
+        if prompt_cache_key:
+            # Sent via extra_body so older openai SDKs without the named
+            # parameter still pass it through.
+            kwargs["extra_body"] = {"prompt_cache_key": prompt_cache_key}
 
         response = self.client.chat.completions.create(**kwargs)
+        usage = getattr(response, "usage", None)
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached = getattr(details, "cached_tokens", None)
+        if usage is not None and cached is not None:
+            logger.debug(
+                "  Prompt tokens: %d (%d served from provider prompt cache)",
+                usage.prompt_tokens, cached,
+            )
         return response.choices[0].message.content or ""
 
     def call(
@@ -52,26 +135,39 @@ class LLMClient:
         user_prompt: str,
         json_mode: bool = True,
         label: str = "api_call",
+        cache_system_prompt: bool = False,
     ) -> str:
         """High-level API call with logging.
 
         Returns the raw response string. If json_mode=True, the caller is
         responsible for parsing JSON from the returned string.
+
+        Pass ``cache_system_prompt=True`` when *system_prompt* is a constant
+        shared by many calls: the request is tagged with a
+        ``prompt_cache_key`` derived from it, so the provider routes those
+        calls to the same prompt cache and reuses the shared prefix.
         """
         messages = [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_prompt},
         ]
-        self._call_count += 1
-        call_id = f"{self._call_count:03d}_{label}"
-        logger.info("API call #%d [%s] model=%s", self._call_count, label, self.model)
+        # Synthesis calls may run on several threads; keep call IDs unique.
+        with self._count_lock:
+            self._call_count += 1
+            call_num = self._call_count
+        call_id = f"{call_num:03d}_{label}"
+        logger.info("API call #%d [%s] model=%s", call_num, label, self.model)
 
         if self.config.dry_run:
             logger.info("  DRY RUN — skipping actual API call")
             return '{"sections": [], "sources": [], "matches": []}'
 
         start = time.time()
-        raw = self._raw_chat(messages, json_mode=json_mode)
+        raw = self._raw_chat(
+            messages,
+            json_mode=json_mode,
+            prompt_cache_key=prompt_fingerprint(system_prompt) if cache_system_prompt else None,
+        )
         elapsed = time.time() - start
         logger.info("  Response received in %.1fs (%d chars)", elapsed, len(raw))
 
@@ -97,3 +193,97 @@ class LLMClient:
         """Call API in JSON mode and parse the response."""
         raw = self.call(system_prompt, user_prompt, json_mode=True, label=label)
         return json.loads(raw)
+
+    def submit_batch(self, requests: list[tuple[str, str, str]]) -> str:
+        """Submit chat completions through the OpenAI Batch API.
+
+        *requests* is a list of ``(custom_id, system_prompt, user_prompt)``
+        tuples; custom_ids must be unique.  Returns the batch ID to pass to
+        :meth:`wait_batch`.  Batch requests are billed at roughly half the
+        synchronous rate but may take up to 24h to complete.
+        """
+        logger.info("Submitting batch of %d requests model=%s", len(requests), self.model)
+        if self.config.dry_run:
+            logger.info("  DRY RUN — skipping batch submission")
+            self._dry_run_batch = [custom_id for custom_id, _, _ in requests]
+            return "dry_run_batch"
+
+        lines = [
+            json.dumps({
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": self.model,
+                    "messages": [
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt},
+                    ],
+                    "temperature": 0.0,
+                },
+            })
+            for custom_id, system_prompt, user_prompt in requests
+        ]
+        payload = io.BytesIO("\n".join(lines).encode("utf-8"))
+        payload.name = "batch_requests.jsonl"
+
+        input_file = self.client.files.create(file=payload, purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+        logger.info("  Batch submitted: %s", batch.id)
+        return batch.id
+
+    def wait_batch(
+        self,
+        batch_id: str,
+        poll_interval: float = 30.0,
+        timeout: float = BATCH_TIMEOUT,
+    ) -> dict[str, str]:
+        """Poll a submitted batch until it finishes; return ``{custom_id: content}``.
+
+        Requests that errored inside an otherwise completed batch are
+        omitted from the result.  Transient API errors while polling or
+        downloading are retried, so a blip does not abandon a batch that
+        is already paid for.  Raises ``RuntimeError`` if the batch
+        itself fails, expires, or is cancelled, and ``TimeoutError`` if it
+        is still unfinished after *timeout* seconds.
+        """
+        if self.config.dry_run:
+            return {
+                custom_id: '{"sections": [], "sources": [], "matches": []}'
+                for custom_id in self._dry_run_batch
+            }
+
+        start = time.time()
+        while True:
+            batch = _retrieve_batch(self.client, batch_id)
+            if batch.status == "completed":
+                break
+            if batch.status in ("failed", "expired", "cancelled"):
+                raise RuntimeError(f"Batch {batch_id} ended with status '{batch.status}'")
+            if time.time() - start >= timeout:
+                raise TimeoutError(
+                    f"Batch {batch_id} still '{batch.status}' after {timeout:.0f}s"
+                )
+            logger.debug("  Batch %s status=%s — waiting", batch_id, batch.status)
+            time.sleep(poll_interval)
+        logger.info("  Batch %s completed in %.1fs", batch_id, time.time() - start)
+
+        results: dict[str, str] = {}
+        if not batch.output_file_id:
+            return results
+        output = _file_text(self.client, batch.output_file_id)
+        for line in output.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            response = record.get("response") or {}
+            if response.get("status_code") != 200:
+                continue
+            choices = response.get("body", {}).get("choices", [])
+            if choices:
+                results[record["custom_id"]] = choices[0]["message"].get("content") or ""
+        return results
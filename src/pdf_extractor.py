@@ -93,13 +93,14 @@ def _strip_headers_footers(
     if len(pages) < threshold:
         return pages
 
-    # Collect first and last lines of each page
+    # Collect the first and last non-blank line of each page, scanning in
+    # from each end rather than stripping every line.
     first_lines: list[str] = []
     last_lines: list[str] = []
     for page in pages:
-        lines = [l.strip() for l in page.split("\n") if l.strip()]
-        first_lines.append(lines[0] if lines else "")
-        last_lines.append(lines[-1] if lines else "")
+        lines = page.split("\n")
+        first_lines.append(next((s for l in lines if (s := l.strip())), ""))
+        last_lines.append(next((s for l in reversed(lines) if (s := l.strip())), ""))
 
     # Count occurrences
     header_counts = Counter(first_lines)
@@ -120,18 +121,14 @@ def _strip_headers_footers(
     if footers_to_strip:
         logger.info("Stripping %d repeated footer pattern(s)", len(footers_to_strip))
 
-    cleaned: list[str] = []
-    for page in pages:
-        lines = page.split("\n")
-        filtered = []
-        for line in lines:
-            stripped = line.strip()
-            if stripped in headers_to_strip or stripped in footers_to_strip:
-                continue
-            filtered.append(line)
-        cleaned.append("\n".join(filtered))
+    to_strip = headers_to_strip | footers_to_strip
+    if not to_strip:
+        return pages
 
-    return cleaned
+    return [
+        "\n".join(line for line in page.split("\n") if line.strip() not in to_strip)
+        for page in pages
+    ]
 
 
 def _ocr_page(page: object, dpi: int = 300) -> str:
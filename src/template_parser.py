@@ -75,17 +75,20 @@ def read_template_text(template_path: Path) -> str:
 # Mapping table parsing
 # ---------------------------------------------------------------------------
 
-_HEADER_KEYWORDS = {"section", "content", "source", "reference", "document"}
+_HEADER_KEYWORDS = frozenset({"section", "content", "source", "reference", "document"})
+# Keywords match as substrings ("DSR Section" -> "section"), so the header
+# is searched once with an alternation rather than once per keyword.
+_HEADER_KEYWORD_RE = re.compile("|".join(sorted(_HEADER_KEYWORDS)))
+
+_SECTION_ID_RE = re.compile(r"\d+(?:\.\d+)*")
 
 _SOURCE_SPLIT_RE = re.compile(r"\s+OR\s+|[;,]\s*", re.IGNORECASE)
 
 
 def _split_source_refs(text: str) -> list[str]:
     """Split a source reference string into individual refs."""
-    if not text.strip():
-        return []
-    parts = _SOURCE_SPLIT_RE.split(text)
-    return [p.strip() for p in parts if p.strip()]
+    # One split pass; blank pieces (including an all-blank input) drop out.
+    return [ref for part in _SOURCE_SPLIT_RE.split(text) if (ref := part.strip())]
 
 
 def _find_column(header: list[str], keywords: list[str]) -> int | None:
@@ -113,7 +116,7 @@ def _parse_mapping_table(
         if not table or len(table) < 2:
             continue
         header_text = " ".join(cell.lower() for cell in table[0])
-        if any(kw in header_text for kw in _HEADER_KEYWORDS):
+        if _HEADER_KEYWORD_RE.search(header_text):
             return _parse_table_rows(table)
 
     return []
@@ -139,11 +142,11 @@ def _parse_table_rows(table: list[list[str]]) -> list[MappingTableEntry]:
         source_text = row[source_col].strip() if source_col < len(row) else ""
 
         # Extract section number from the section text
-        m = re.match(r"(\d+(?:\.\d+)*)", section_text)
+        m = _SECTION_ID_RE.match(section_text)
         if not m:
             continue
 
-        section_id = m.group(1)
+        section_id = m.group()
         title = section_text[m.end():].strip().lstrip("-").strip()
         source_refs = _split_source_refs(source_text)
 
@@ -172,11 +175,10 @@ def get_mapping_entries(template_path: Path) -> list[MappingTableEntry]:
 # IGNORE section handling
 # ---------------------------------------------------------------------------
 
-_IGNORE_PATTERNS = [
-    re.compile(r"\bignore\b", re.IGNORECASE),
-    re.compile(r"previous\s+template\s+version", re.IGNORECASE),
-    re.compile(r"do\s+not\s+use", re.IGNORECASE),
-]
+_IGNORE_RE = re.compile(
+    r"\bignore\b|previous\s+template\s+version|do\s+not\s+use",
+    re.IGNORECASE,
+)
 
 
 def _mark_ignore_sections(sections: list[TemplateSection]) -> None:
@@ -185,24 +187,20 @@ def _mark_ignore_sections(sections: list[TemplateSection]) -> None:
     When an IGNORE marker is found, that section and all following
     sections are marked with ignore=True.
     """
-    ignore_from: int | None = None
-    for i, section in enumerate(sections):
+    for ignore_from, section in enumerate(sections):
         full_text = f"{section.section_id} {section.title} {section.body[:200]}"
-        for pattern in _IGNORE_PATTERNS:
-            if pattern.search(full_text):
-                ignore_from = i
-                break
-        if ignore_from is not None:
+        if _IGNORE_RE.search(full_text):
             break
+    else:
+        return
 
-    if ignore_from is not None:
-        logger.info(
-            "Marking sections from index %d onwards as IGNORE (%d sections)",
-            ignore_from,
-            len(sections) - ignore_from,
-        )
-        for section in sections[ignore_from:]:
-            section.ignore = True
+    logger.info(
+        "Marking sections from index %d onwards as IGNORE (%d sections)",
+        ignore_from,
+        len(sections) - ignore_from,
+    )
+    for section in sections[ignore_from:]:
+        section.ignore = True
 
 
 def _apply_mapping_table(
@@ -8,16 +8,24 @@ document plus a .docx conversion.
 from __future__ import annotations
 
 import re
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+from copy import deepcopy
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import chain, islice
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Iterable, Iterator, Sequence
 
 from docx import Document
+from docx.oxml.ns import nsdecls
 
-from src.ib_resolver import resolve_sources
+from src.ib_resolver import ResolvedSource, clean_source_text, resolve_sources_bulk
 from src.models import TemplateSection
 from src.utils import ensure_dir, logger
 
 if TYPE_CHECKING:
+    from src.llm_cache import LLMCache
     from src.openai_client import LLMClient
 
 
@@ -59,40 +67,159 @@ def _build_synthesis_prompt(
 ) -> str:
     """Build the user prompt for LLM synthesis.
 
+    Parts are ordered from most to least shareable — source material,
+    then template instructions, then the section line — so consecutive
+    sections citing the same sources share a long prompt prefix that the
+    provider's prompt cache can reuse.
+
     Args:
         section: The template section being populated.
         source_contents: List of (source_label, content) tuples from resolved sources.
     """
     parts: list[str] = []
-    parts.append(f"SECTION: {section.section_id} — {section.title}")
-    parts.append("")
-
-    if section.body:
-        parts.append("TEMPLATE INSTRUCTIONS (for your guidance, do NOT include these in the output):")
-        parts.append(section.body)
-        parts.append("")
 
     if source_contents:
         parts.append("SOURCE MATERIAL:")
-        for label, content in source_contents:
+        for label, content, truncated in _truncate_sources(
+            _dedup_source_contents(source_contents), section.body,
+        ):
             parts.append(f"\n--- {label} ---")
-            # Truncate very long sources to stay within token limits
-            if len(content) > 12000:
-                parts.append(content[:12000])
+            parts.append(content)
+            if truncated:
                 parts.append("[... content truncated for length ...]")
-            else:
-                parts.append(content)
         parts.append("")
     else:
         parts.append("SOURCE MATERIAL: None available.")
         parts.append(
             "Write a structured placeholder noting what data this section "
-            "requires and from which sources, based on the template instructions above."
+            "requires and from which sources, based on the template instructions below."
         )
+        parts.append("")
+
+    if section.body:
+        parts.append("TEMPLATE INSTRUCTIONS (for your guidance, do NOT include these in the output):")
+        parts.append(section.body)
+        parts.append("")
+
+    parts.append(f"SECTION: {section.section_id} — {section.title}")
 
     return "\n".join(parts)
 
 
+# Token budget for the source material of one synthesis prompt.  Capped
+# well below the model context so a single long source cannot make every
+# call expensive; shared fairly when a section cites several sources.
+_TOKENIZER_MODEL = "gpt-4o"
+_MODEL_CONTEXT_TOKENS = 128000
+_OUTPUT_RESERVE_TOKENS = 4096
+_SOURCE_TOKEN_BUDGET = 16000
+# Per-source character limit used when no tokenizer is available.
+_SOURCE_CHAR_LIMIT = 12000
+
+
+@lru_cache(maxsize=1)
+def _get_encoder():
+    """Return the tiktoken encoding for synthesis prompts, or None if unavailable."""
+    try:
+        import tiktoken
+
+        return tiktoken.encoding_for_model(_TOKENIZER_MODEL)
+    except Exception as e:
+        logger.warning("tiktoken unavailable (%s) — truncating sources by characters", e)
+        return None
+
+
+@lru_cache(maxsize=4)
+def _system_prompt_tokens(enc) -> int:
+    """Token count of ``SYNTHESIS_SYSTEM`` under *enc*, encoded once per encoder."""
+    return len(enc.encode(SYNTHESIS_SYSTEM))
+
+
+def _fair_token_budgets(lengths: list[int], total: int) -> list[int]:
+    """Split *total* tokens across sources of the given token *lengths*.
+
+    Max-min fair: sources shorter than an equal share keep their full
+    length and the unused remainder is spread over the longer ones.
+    """
+    budgets = [0] * len(lengths)
+    remaining = max(total, 0)
+    order = sorted(range(len(lengths)), key=lengths.__getitem__)
+    for k, idx in enumerate(order):
+        share = remaining // (len(order) - k)
+        budgets[idx] = min(lengths[idx], share)
+        remaining -= budgets[idx]
+    return budgets
+
+
+def _truncate_sources(
+    sources: list[tuple[str, str]],
+    instructions: str,
+) -> list[tuple[str, str, bool]]:
+    """Truncate source contents to the prompt token budget.
+
+    Returns ``(label, content, truncated)`` triples.  Falls back to a
+    per-source character limit when tiktoken cannot be loaded.
+    """
+    enc = _get_encoder()
+    if enc is None:
+        return [
+            (label, content[:_SOURCE_CHAR_LIMIT], len(content) > _SOURCE_CHAR_LIMIT)
+            for label, content in sources
+        ]
+
+    fixed = _system_prompt_tokens(enc) + len(enc.encode(instructions or ""))
+    available = min(
+        _SOURCE_TOKEN_BUDGET,
+        _MODEL_CONTEXT_TOKENS - fixed - _OUTPUT_RESERVE_TOKENS,
+    )
+    encoded = [enc.encode(content) for _, content in sources]
+    budgets = _fair_token_budgets([len(toks) for toks in encoded], available)
+
+    result: list[tuple[str, str, bool]] = []
+    for (label, content), toks, budget in zip(sources, encoded, budgets):
+        if len(toks) > budget:
+            result.append((label, enc.decode(toks[:budget]), True))
+        else:
+            result.append((label, content, False))
+    return result
+
+
+def _dedup_source_contents(
+    source_contents: list[tuple[str, str]],
+) -> list[tuple[str, str]]:
+    """Merge sources with identical content into a single labelled entry.
+
+    Cross-references (e.g. "IB 2.3" and "IB Section 2.3") often resolve to
+    the same text; sending it once with a combined label ("IB 2.3, IB
+    Section 2.3") saves prompt tokens.  First-seen order is preserved.
+    """
+    labels_by_content: dict[str, list[str]] = {}
+    for label, content in source_contents:
+        labels_by_content.setdefault(content, []).append(label)
+    return [(", ".join(labels), content) for content, labels in labels_by_content.items()]
+
+
+def _resolve_all_refs(
+    template_sections: list[TemplateSection],
+    ib_index: dict[str, str],
+    pbrer_index: dict[str, str] | None = None,
+    literature_results: dict[str, str] | None = None,
+) -> dict[str, list[ResolvedSource]]:
+    """Resolve every distinct source reference across the report once.
+
+    Returns a ``{ref: [ResolvedSource, ...]}`` map.  A ref maps to a list
+    because compound refs ("IB Sections 1.2, 3.2") expand to several
+    resolved sources.
+    """
+    return resolve_sources_bulk(
+        (ref for section in template_sections for ref in section.required_sources),
+        ib_index,
+        pbrer_index=pbrer_index,
+        literature_results=literature_results,
+    )
+
+
+@lru_cache(maxsize=4096)
 def _heading_level(section_id: str) -> int:
     """Determine the markdown heading level from a section_id's depth.
 
@@ -103,14 +230,47 @@ def _heading_level(section_id: str) -> int:
     - Cap at 6
     """
     parts = section_id.strip().split(".")
-    try:
-        for p in parts:
-            int(p)
-        depth = len(parts)
-        level = depth + 1
-        return min(level, 6)
-    except ValueError:
-        return 2
+    if all(p.isdecimal() for p in parts):
+        return min(len(parts) + 1, 6)
+    return 2
+
+
+@dataclass
+class _SectionPlan:
+    """Precomputed per-section layout decisions for ``assemble_markdown``."""
+
+    section: TemplateSection
+    heading: str
+    is_exec_summary: bool
+    skip: bool
+
+
+def _plan_sections(
+    template_sections: list[TemplateSection],
+    use_synthesis: bool,
+) -> list[_SectionPlan]:
+    """Decide heading text, exec-summary deferral, and dedup skip per section.
+
+    Children with no required_sources are skipped when their parent section
+    is also in the list (the parent's synthesized body already covers them).
+    Executive Summary subsections (1.x without sources) are deferred to the
+    second pass when synthesizing.
+    """
+    all_ids = {s.section_id for s in template_sections}
+    plans: list[_SectionPlan] = []
+    for section in template_sections:
+        sid = section.section_id
+        parent, sep, _ = sid.rpartition(".")
+        skip = bool(sep) and parent in all_ids and not section.required_sources
+        plans.append(_SectionPlan(
+            section=section,
+            heading=f"{'#' * _heading_level(sid)} {sid} {section.title}",
+            is_exec_summary=(
+                sid.startswith("1.") and not section.required_sources and use_synthesis
+            ),
+            skip=skip,
+        ))
+    return plans
 
 
 def assemble_markdown(
@@ -120,127 +280,420 @@ def assemble_markdown(
     dry_run: bool = False,
     pbrer_index: dict[str, str] | None = None,
     literature_results: dict[str, str] | None = None,
+    use_cache: bool = True,
 ) -> str:
     """Build a single markdown document from template sections and resolved content.
 
     When *llm* is provided and *dry_run* is False, each section's resolved
     source material is sent through the LLM for synthesis into report-ready
     prose.  In dry-run mode or when no LLM is available, the legacy behavior
-    (raw source paste / template body) is preserved.
+    (raw source paste / template body) is preserved.  Sections whose prompt
+    (template body, resolved sources, model) is unchanged since a previous
+    run are served from ``llm.cache``; pass ``use_cache=False`` to force
+    fresh synthesis.
     """
-    lines: list[str] = ["# Filled Signal Assessment Report\n"]
-    use_synthesis = llm is not None and not dry_run
+    return "".join(iter_markdown(
+        template_sections, ib_index,
+        llm=llm,
+        dry_run=dry_run,
+        pbrer_index=pbrer_index,
+        literature_results=literature_results,
+        use_cache=use_cache,
+    ))
 
-    # Build lookup structures for dedup: skip children that have no
-    # required_sources when their parent section is already in the list
-    # (the parent's synthesized body already covers them).
-    all_ids = {s.section_id for s in template_sections}
-    sections_with_sources = {
-        s.section_id for s in template_sections if s.required_sources
-    }
 
-    def _parent_id(section_id: str) -> str | None:
-        """Return the parent section ID, e.g. '3.1' for '3.1.2'."""
-        parts = section_id.rsplit(".", 1)
-        return parts[0] if len(parts) > 1 else None
+def iter_markdown(
+    template_sections: list[TemplateSection],
+    ib_index: dict[str, str],
+    llm: LLMClient | None = None,
+    dry_run: bool = False,
+    pbrer_index: dict[str, str] | None = None,
+    literature_results: dict[str, str] | None = None,
+    use_cache: bool = True,
+) -> Iterator[str]:
+    """Yield the ``assemble_markdown`` document as text chunks.
+
+    The chunks concatenate to exactly what ``assemble_markdown`` returns,
+    so they can go straight to ``file.writelines`` without building the
+    joined string.  Synthesis still completes before the first chunk,
+    because the Executive Summary depends on every other section.
+    """
+    blocks = _assemble_blocks(
+        template_sections, ib_index,
+        llm=llm,
+        dry_run=dry_run,
+        pbrer_index=pbrer_index,
+        literature_results=literature_results,
+        use_cache=use_cache,
+    )
+    return _iter_markdown_chunks(blocks)
+
 
-    def _should_skip_child(section_id: str) -> bool:
-        """Skip a child section if it has no sources and its parent exists."""
-        pid = _parent_id(section_id)
-        return pid is not None and pid in all_ids and section_id not in sections_with_sources
+def _assemble_blocks(
+    template_sections: list[TemplateSection],
+    ib_index: dict[str, str],
+    llm: LLMClient | None = None,
+    dry_run: bool = False,
+    pbrer_index: dict[str, str] | None = None,
+    literature_results: dict[str, str] | None = None,
+    use_cache: bool = True,
+) -> list[str]:
+    """Build the markdown document as a list of blocks.
+
+    Blocks carry no trailing blank line; they are separated by ``"\\n\\n"``
+    and the document ends with a single ``"\\n"``.  Kept separate from
+    ``assemble_markdown`` so ``write_filled_template`` can stream the blocks
+    to disk without materializing the joined string.
+    """
+    lines: list[str] = ["# Filled Signal Assessment Report"]
+    use_synthesis = llm is not None and not dry_run
+    cache = getattr(llm, "cache", None) if use_cache else None
+
+    # Resolve each distinct source ref once — the same IB cross-ref is
+    # commonly cited by several sections.
+    resolved_by_ref = _resolve_all_refs(
+        template_sections,
+        ib_index,
+        pbrer_index=pbrer_index,
+        literature_results=literature_results,
+    )
 
     # Track section content for Executive Summary second pass
     section_contents: dict[str, str] = {}
-
-    for section in template_sections:
-        level = _heading_level(section.section_id)
-        hashes = "#" * level
-        lines.append(f"{hashes} {section.section_id} {section.title}\n")
-
-        # Check if this is an Executive Summary subsection (1.x) — defer
-        # to the second pass so it can use IB content + completed report.
-        # This MUST come before the dedup skip, otherwise the placeholder
-        # is never inserted and the second pass has nothing to fill.
-        is_exec_summary = (
-            section.section_id.startswith("1.")
-            and not section.required_sources
-            and use_synthesis
-        )
-        if is_exec_summary:
+    jobs: list[_SynthesisJob] = []
+    # section_id -> index in ``lines`` of its Executive Summary placeholder
+    exec_slots: dict[str, int] = {}
+
+    for plan in _plan_sections(template_sections, use_synthesis):
+        section = plan.section
+        lines.append(plan.heading)
+
+        # Executive Summary subsections are deferred to the second pass so
+        # they can use IB content + the completed report.  This MUST come
+        # before the dedup skip, otherwise the placeholder is never
+        # inserted and the second pass has nothing to fill.
+        if plan.is_exec_summary:
             # Placeholder marker; will be replaced in second pass
-            lines.append(f"{{{{EXEC_SUMMARY_{section.section_id}}}}}\n")
+            exec_slots[section.section_id] = len(lines)
+            lines.append(f"{{{{EXEC_SUMMARY_{section.section_id}}}}}")
             continue
 
-        # Skip children without their own sources when the parent section
-        # is in the list — the parent's body already covers them.
-        if _should_skip_child(section.section_id):
+        if plan.skip:
             continue
 
-        section_text = ""
-
         if not section.required_sources:
             # No sources referenced in template
             if use_synthesis and section.body:
-                prompt = _build_synthesis_prompt(section, [])
-                try:
-                    section_text = llm.call(
-                        system_prompt=SYNTHESIS_SYSTEM,
-                        user_prompt=prompt,
-                        json_mode=False,
-                        label=f"synth_{section.section_id}",
-                    ).strip()
-                except Exception as e:
-                    logger.warning(
-                        "Synthesis failed for %s: %s — falling back to template body",
-                        section.section_id, e,
-                    )
-                    section_text = section.body
-            elif section.body:
-                section_text = section.body
+                jobs.append(_SynthesisJob(
+                    section_id=section.section_id,
+                    line_idx=len(lines),
+                    label=f"synth_{section.section_id}",
+                    system_prompt=SYNTHESIS_SYSTEM,
+                    user_prompt=_build_synthesis_prompt(section, []),
+                    fallback=section.body,
+                    fallback_desc="template body",
+                ))
+                lines.append("")
+                continue
+            section_text = section.body
         else:
-            # Resolve sources
-            resolved = resolve_sources(
-                section.required_sources,
-                ib_index,
-                pbrer_index=pbrer_index,
-                literature_results=literature_results,
-            )
-
-            if use_synthesis:
-                source_contents: list[tuple[str, str]] = []
-                for rs in resolved:
-                    source_contents.append((rs.original_ref, rs.content))
-
-                prompt = _build_synthesis_prompt(section, source_contents)
-                try:
-                    section_text = llm.call(
-                        system_prompt=SYNTHESIS_SYSTEM,
-                        user_prompt=prompt,
-                        json_mode=False,
-                        label=f"synth_{section.section_id}",
-                    ).strip()
-                except Exception as e:
-                    logger.warning(
-                        "Synthesis failed for %s: %s — falling back to raw sources",
-                        section.section_id, e,
-                    )
-                    raw_lines: list[str] = []
-                    _append_raw_sources(raw_lines, resolved)
-                    section_text = "\n".join(raw_lines)
+            refs = section.required_sources
+            if len(refs) == 1:
+                # Most sections cite a single source; reuse its list as is.
+                resolved = resolved_by_ref[refs[0]]
             else:
-                raw_lines = []
-                _append_raw_sources(raw_lines, resolved)
-                section_text = "\n".join(raw_lines)
+                resolved = [rs for ref in refs for rs in resolved_by_ref[ref]]
+            section_text = _format_raw_sources(resolved)
+
+            # Nothing resolved: the output would only restate the
+            # placeholders, so skip the call and emit them directly.
+            if use_synthesis and any(rs.found for rs in resolved):
+                source_contents = [(rs.original_ref, rs.content) for rs in resolved]
+                jobs.append(_SynthesisJob(
+                    section_id=section.section_id,
+                    line_idx=len(lines),
+                    label=f"synth_{section.section_id}",
+                    system_prompt=SYNTHESIS_SYSTEM,
+                    user_prompt=_build_synthesis_prompt(section, source_contents),
+                    fallback=section_text,
+                    fallback_desc="raw sources",
+                    sources=tuple(refs),
+                ))
+                lines.append("")
+                continue
 
         if section_text:
-            lines.append(f"{section_text}\n")
+            lines.append(section_text)
             section_contents[section.section_id] = section_text
 
+    # Run all synthesis calls, then splice results into their reserved slots
+    for job, text in zip(jobs, _run_synthesis_jobs(jobs, llm, cache)):
+        if text is None:
+            text = job.fallback
+        if text:
+            lines[job.line_idx] = text
+            section_contents[job.section_id] = text
+    empty_slots = {job.line_idx for job in jobs if not lines[job.line_idx]}
+
     # --- Second pass: fill Executive Summary from IB + completed report ---
     if use_synthesis:
-        _fill_executive_summary(lines, template_sections, section_contents, ib_index, llm)
+        _fill_executive_summary(
+            lines, exec_slots, template_sections, section_contents, ib_index, llm,
+            cache=cache,
+        )
+
+    if empty_slots:
+        lines = [line for i, line in enumerate(lines) if i not in empty_slots]
+    return lines
+
+
+@dataclass
+class _SynthesisJob:
+    """A pending LLM synthesis call and the output slot it fills."""
+
+    section_id: str
+    line_idx: int
+    label: str
+    system_prompt: str
+    user_prompt: str
+    fallback: str
+    fallback_desc: str
+    # Source refs the prompt opens with; equal refs mean a shared prefix.
+    sources: tuple[str, ...] = ()
+
+
+def _run_synthesis_jobs(
+    jobs: list[_SynthesisJob],
+    llm: LLMClient | None,
+    cache: LLMCache | None = None,
+) -> list[str | None]:
+    """Run synthesis jobs and return their outputs in job order.
+
+    A ``None`` entry means the call failed and the caller should use the
+    job's fallback.  When ``llm.batch_mode`` is set, all jobs are submitted
+    together through the provider Batch API instead of one call each.  When
+    ``llm.sections_per_call`` is above 1, consecutive jobs are grouped into
+    multi-section prompts (see ``_run_job_group``).  Calls run on up to
+    ``llm.concurrency`` threads.  Responses found in *cache* are reused
+    without a call, and fresh responses are stored there.
+    """
+    if not jobs:
+        return []
+
+    # Cache lookups may embed the prompt remotely, so they share the
+    # worker pool with the synthesis calls.
+    with ThreadPoolExecutor(max_workers=llm.concurrency) as pool:
+        if cache is None:
+            return _dispatch_synthesis_jobs(jobs, llm, pool)
+
+        lookups = list(pool.map(
+            lambda job: cache.lookup(job.system_prompt, job.user_prompt, job.section_id),
+            jobs,
+        ))
+        results: list[str | None] = [text for text, _ in lookups]
+        misses = [i for i, text in enumerate(results) if text is None]
+        if len(misses) < len(jobs):
+            logger.info(
+                "LLM cache: %d/%d synthesis calls served from cache",
+                len(jobs) - len(misses), len(jobs),
+            )
+        if misses:
+            outputs = _dispatch_synthesis_jobs([jobs[i] for i in misses], llm, pool)
+            for i, text in zip(misses, outputs):
+                results[i] = text
+                if text is not None:
+                    job = jobs[i]
+                    cache.set(
+                        job.system_prompt, job.user_prompt, text,
+                        section_id=job.section_id, embedding=lookups[i][1],
+                    )
+    return results
+
+
+def _dispatch_synthesis_jobs(
+    jobs: list[_SynthesisJob],
+    llm: LLMClient,
+    pool: ThreadPoolExecutor,
+) -> list[str | None]:
+    """Send *jobs* to the LLM (batch, grouped, or one call each).
+
+    User prompts open with their source material, so jobs citing the
+    same sources are sent back to back: the provider's prompt cache still
+    holds their shared prefix, and grouped calls put them together.
+    Results come back in *jobs* order.
+    """
+    order = sorted(range(len(jobs)), key=lambda i: jobs[i].sources)
+    outputs = _send_synthesis_jobs([jobs[i] for i in order], llm, pool)
+    results: list[str | None] = [None] * len(jobs)
+    for i, text in zip(order, outputs):
+        results[i] = text
+    return results
+
+
+def _send_synthesis_jobs(
+    jobs: list[_SynthesisJob],
+    llm: LLMClient,
+    pool: ThreadPoolExecutor,
+) -> list[str | None]:
+    """Run *jobs* on *pool* and return their outputs in the given order."""
+    if getattr(llm, "batch_mode", False):
+        return _run_synthesis_batch(jobs, llm)
 
-    return "\n".join(lines)
+    per_call = getattr(llm, "sections_per_call", 1)
+    groups = _group_jobs(jobs, per_call) if per_call > 1 else [[job] for job in jobs]
+
+    # The calls are independent and I/O-bound, so issue them concurrently;
+    # map() keeps results in submission order.
+    group_results = list(pool.map(lambda group: _run_job_group(group, llm), groups))
+    return [text for texts in group_results for text in texts]
+
+
+def _run_single_job(job: _SynthesisJob, llm: LLMClient) -> str | None:
+    """Run one synthesis call; ``None`` means the caller should fall back."""
+    try:
+        return llm.call(
+            system_prompt=job.system_prompt,
+            user_prompt=job.user_prompt,
+            json_mode=False,
+            label=job.label,
+            cache_system_prompt=True,
+        ).strip()
+    except Exception as e:
+        logger.warning(
+            "Synthesis failed for %s: %s — falling back to %s",
+            job.section_id, e, job.fallback_desc,
+        )
+        return None
+
+
+# ---------------------------------------------------------------------------
+# Multi-section prompting
+# ---------------------------------------------------------------------------
+
+# Upper bound on the combined user-prompt size of one multi-section call,
+# so a group of long sections does not overflow the model context.
+_GROUP_PROMPT_CHAR_BUDGET = 60000
+
+BATCH_SYNTHESIS_ADDENDUM = """\
+
+
+You will receive several independent queries, each introduced by a line \
+"### QUERY k: <section id> ###". Answer every query separately, following \
+the rules above for each one. Wrap the answer to query k between a line \
+"<<<SECTION k>>>" and a line "<<<END k>>>", and answer the queries in \
+order. Write nothing outside these markers.\
+"""
+
+_OUTPUT_BLOCK_RE = re.compile(r"<<<SECTION (\d+)>>>(.*?)<<<END \1>>>", re.DOTALL)
+
+
+def _group_jobs(jobs: list[_SynthesisJob], size: int) -> list[list[_SynthesisJob]]:
+    """Split *jobs* into consecutive groups for multi-section calls.
+
+    A group holds at most *size* jobs that share a system prompt and whose
+    user prompts fit within ``_GROUP_PROMPT_CHAR_BUDGET`` together.
+    """
+    groups: list[list[_SynthesisJob]] = []
+    current: list[_SynthesisJob] = []
+    current_chars = 0
+    for job in jobs:
+        if current and (
+            len(current) >= size
+            or job.system_prompt != current[0].system_prompt
+            or current_chars + len(job.user_prompt) > _GROUP_PROMPT_CHAR_BUDGET
+        ):
+            groups.append(current)
+            current, current_chars = [], 0
+        current.append(job)
+        current_chars += len(job.user_prompt)
+    if current:
+        groups.append(current)
+    return groups
+
+
+def _build_batch_synthesis_prompt(jobs: list[_SynthesisJob]) -> str:
+    """Concatenate the user prompts of *jobs* under numbered query delimiters."""
+    parts: list[str] = []
+    for k, job in enumerate(jobs, 1):
+        parts.append(f"### QUERY {k}: {job.section_id} ###")
+        parts.append(job.user_prompt)
+        parts.append("")
+    return "\n".join(parts)
+
+
+def _parse_batch_response(text: str, n: int) -> list[str | None]:
+    """Extract the *n* answers from a multi-section response.
+
+    Each answer must be closed by its matching ``<<<END k>>>`` marker, so
+    a response cut off mid-section loses only that section.  Missing,
+    unterminated, empty, or out-of-range answers come back as ``None``.
+    """
+    outputs: list[str | None] = [None] * n
+    for m in _OUTPUT_BLOCK_RE.finditer(text):
+        k = int(m.group(1))
+        if 1 <= k <= n and outputs[k - 1] is None:
+            outputs[k - 1] = m.group(2).strip() or None
+    return outputs
+
+
+def _run_job_group(group: list[_SynthesisJob], llm: LLMClient) -> list[str | None]:
+    """Synthesize *group* in one call; sections missing from the reply are retried alone."""
+    if len(group) == 1:
+        return [_run_single_job(group[0], llm)]
+
+    label = f"{group[0].label}__{group[-1].section_id}"
+    try:
+        raw = llm.call(
+            system_prompt=group[0].system_prompt + BATCH_SYNTHESIS_ADDENDUM,
+            user_prompt=_build_batch_synthesis_prompt(group),
+            json_mode=False,
+            label=label,
+            cache_system_prompt=True,
+        )
+        outputs = _parse_batch_response(raw, len(group))
+    except Exception as e:
+        logger.warning("Grouped synthesis failed for %s: %s", label, e)
+        outputs = [None] * len(group)
+
+    missing = [i for i, text in enumerate(outputs) if text is None]
+    if missing:
+        logger.warning(
+            "Grouped response for %s lacks %d of %d sections — retrying them individually",
+            label, len(missing), len(group),
+        )
+        for i in missing:
+            outputs[i] = _run_single_job(group[i], llm)
+    return outputs
+
+
+def _run_synthesis_batch(
+    jobs: list[_SynthesisJob],
+    llm: LLMClient,
+) -> list[str | None]:
+    """Submit *jobs* as one provider batch and wait for the results."""
+    custom_ids = [f"{i:04d}_{job.label}" for i, job in enumerate(jobs)]
+    try:
+        batch_id = llm.submit_batch([
+            (cid, job.system_prompt, job.user_prompt)
+            for cid, job in zip(custom_ids, jobs)
+        ])
+        outputs = llm.wait_batch(batch_id)
+    except Exception as e:
+        logger.warning("Batch synthesis failed: %s — falling back for all %d jobs", e, len(jobs))
+        return [None] * len(jobs)
+
+    results: list[str | None] = []
+    for cid, job in zip(custom_ids, jobs):
+        text = outputs.get(cid)
+        if text is None:
+            logger.warning(
+                "No batch result for %s — falling back to %s",
+                job.section_id, job.fallback_desc,
+            )
+            results.append(None)
+        else:
+            results.append(text.strip())
+    return results
 
 
 EXEC_SUMMARY_SYSTEM = """\
@@ -291,6 +744,29 @@ _EXEC_IB_KEYWORDS: list[tuple[list[str], list[str]]] = [
      ["5.5"]),  # Clinical studies / exposure data
 ]
 
+# "Table N" mentions in an Executive Summary body.
+_TABLE_REF_RE = re.compile(r"Table\s*(\d+)")
+
+
+@lru_cache(maxsize=256)
+def _exec_ib_targets(title: str, body: str) -> tuple[tuple[str, ...], tuple[str, ...]]:
+    """IB section and table numbers an Executive Summary subsection asks for.
+
+    Depends only on the subsection text, which recurs across reports, so
+    it is memoized; the lookups against a particular IB index are not.
+    Both tuples are deduplicated in first-seen order.
+    """
+    combined = f"{title.lower()} {body.lower() if body else ''}"
+    sections = dict.fromkeys(
+        num
+        for keywords, ib_nums in _EXEC_IB_KEYWORDS
+        if any(kw in combined for kw in keywords)
+        for num in ib_nums
+    )
+    # A table mentioned twice in the body is pulled once.
+    tables = dict.fromkeys(_TABLE_REF_RE.findall(body or ""))
+    return tuple(sections), tuple(tables)
+
 
 def _resolve_ib_for_exec(
     title: str,
@@ -302,42 +778,33 @@ def _resolve_ib_for_exec(
     Matches the subsection title against ``_EXEC_IB_KEYWORDS`` to find
     which IB sections to pull.  Returns ``(label, content)`` pairs.
     """
-    from .ib_resolver import clean_source_text
-
-    title_lower = title.lower()
-    body_lower = body.lower() if body else ""
-    combined = f"{title_lower} {body_lower}"
-
-    # Collect all matching IB section numbers
-    ib_sections_needed: list[str] = []
-    for keywords, ib_nums in _EXEC_IB_KEYWORDS:
-        if any(kw in combined for kw in keywords):
-            ib_sections_needed.extend(ib_nums)
-
-    # Deduplicate while preserving order
-    seen: set[str] = set()
-    unique_sections: list[str] = []
-    for num in ib_sections_needed:
-        if num not in seen:
-            seen.add(num)
-            unique_sections.append(num)
+    unique_sections, table_matches = _exec_ib_targets(title, body)
 
     # Resolve each IB section from the index
     results: list[tuple[str, str]] = []
+    sorted_keys: list[str] | None = None  # built on the first prefix lookup
     for sec_num in unique_sections:
         # Direct match
-        if sec_num in ib_index:
+        text = ib_index.get(sec_num)
+        if text is not None:
             results.append((
                 f"IB Section {sec_num}",
-                clean_source_text(ib_index[sec_num]),
+                clean_source_text(text),
             ))
             continue
         # Try prefix match — find subsections under this number
+        # Keys sharing the prefix are contiguous in sorted order, so
+        # bisect to the first one and stop at the first that differs.
         prefix = sec_num + "."
+        if sorted_keys is None:
+            sorted_keys = sorted(ib_index)
         matched_parts: list[str] = []
-        for idx_num in sorted(ib_index.keys()):
-            if idx_num.startswith(prefix) and ib_index[idx_num].strip():
-                matched_parts.append(ib_index[idx_num])
+        for idx_num in islice(sorted_keys, bisect_left(sorted_keys, prefix), None):
+            if not idx_num.startswith(prefix):
+                break
+            text = ib_index[idx_num]
+            if text.strip():
+                matched_parts.append(text)
         if matched_parts:
             results.append((
                 f"IB Section {sec_num} (subsections)",
@@ -345,11 +812,11 @@ def _resolve_ib_for_exec(
             ))
 
     # Also search for "IB Table" references in the body text
-    import re as _re
-    table_matches = _re.findall(r"Table\s*(\d+)", body or "")
     for table_num in table_matches:
+        # The number varies per match; compile once for the index scan.
+        table_re = re.compile(rf"\bTable\s*{table_num}\b")
         for _sec_num, content in ib_index.items():
-            if _re.search(rf"\bTable\s*{_re.escape(table_num)}\b", content):
+            if table_re.search(content):
                 results.append((
                     f"IB Table {table_num}",
                     clean_source_text(content),
@@ -361,13 +828,18 @@ def _resolve_ib_for_exec(
 
 def _fill_executive_summary(
     lines: list[str],
+    exec_slots: dict[str, int],
     template_sections: list[TemplateSection],
     section_contents: dict[str, str],
     ib_index: dict[str, str],
     llm: LLMClient,
+    cache: LLMCache | None = None,
 ) -> None:
     """Replace Executive Summary placeholders with IB-sourced content.
 
+    *exec_slots* maps each deferred section_id to the index of its
+    placeholder in *lines*, as recorded by the first pass.
+
     For each Executive Summary subsection, resolves the relevant IB
     sections based on the subsection title, and feeds that focused
     source material (plus the completed report body for context) to
@@ -385,131 +857,185 @@ def _fill_executive_summary(
         if s.section_id.startswith("1.") and not s.required_sources
     ]
 
+    jobs: list[_SynthesisJob] = []
     for section in exec_sections:
-        marker = f"{{{{EXEC_SUMMARY_{section.section_id}}}}}"
-        found = False
-        for i, line in enumerate(lines):
-            if marker in line:
-                found = True
-
-                # Resolve IB content for this subsection
-                ib_sources = _resolve_ib_for_exec(
-                    section.title, section.body, ib_index,
-                )
-
-                # Build prompt with focused IB content
-                prompt_parts: list[str] = [
-                    f"SECTION: {section.section_id} — {section.title}",
-                    "",
-                ]
-
-                if section.body:
-                    prompt_parts.append(
-                        "TEMPLATE GUIDANCE (for your guidance, do NOT "
-                        "include these instructions in the output):"
-                    )
-                    prompt_parts.append(section.body)
-                    prompt_parts.append("")
-
-                if ib_sources:
-                    prompt_parts.append("SOURCE MATERIAL FROM INVESTIGATOR'S BROCHURE:")
-                    for label, content in ib_sources:
-                        # Truncate individual sources to stay within limits
-                        if len(content) > 8000:
-                            content = content[:8000] + "\n[... truncated ...]"
-                        prompt_parts.append(f"\n--- {label} ---")
-                        prompt_parts.append(content)
-                    prompt_parts.append("")
-
-                # Add relevant report body sections for additional context
-                if report_body.strip():
-                    # Truncate report body to leave room for IB content
-                    max_body = 15000 if ib_sources else 25000
-                    body_text = report_body
-                    if len(body_text) > max_body:
-                        body_text = body_text[:max_body] + "\n[... truncated ...]"
-                    prompt_parts.append("COMPLETED REPORT BODY (for additional context):")
-                    prompt_parts.append(body_text)
-
-                prompt = "\n".join(prompt_parts)
-
-                if not ib_sources and not report_body.strip():
-                    logger.warning(
-                        "No IB or report content for Executive Summary %s",
-                        section.section_id,
-                    )
-                    lines[i] = (
-                        f"[ADDITIONAL DATA NEEDED: No source material available "
-                        f"for {section.title}.]\n"
-                    )
-                    break
-
-                logger.info(
-                    "Synthesizing Executive Summary %s with %d IB sources",
-                    section.section_id, len(ib_sources),
-                )
-
-                try:
-                    content = llm.call(
-                        system_prompt=EXEC_SUMMARY_SYSTEM,
-                        user_prompt=prompt,
-                        json_mode=False,
-                        label=f"exec_{section.section_id}",
-                    ).strip()
-                    lines[i] = f"{content}\n"
-                    logger.info(
-                        "Filled Executive Summary %s (%d chars)",
-                        section.section_id, len(content),
-                    )
-                except Exception as e:
-                    logger.warning(
-                        "Executive Summary synthesis failed for %s: %s",
-                        section.section_id, e,
-                    )
-                    lines[i] = (
-                        f"[ADDITIONAL DATA NEEDED: Executive summary for "
-                        f"{section.title} — synthesis failed.]\n"
-                    )
-                break
-        if not found:
+        line_idx = exec_slots.get(section.section_id)
+        if line_idx is None:
             logger.debug("No placeholder found for exec summary %s", section.section_id)
+            continue
+
+        # Resolve IB content for this subsection
+        ib_sources = _resolve_ib_for_exec(
+            section.title, section.body, ib_index,
+        )
+
+        if not ib_sources and not report_body.strip():
+            logger.warning(
+                "No IB or report content for Executive Summary %s",
+                section.section_id,
+            )
+            lines[line_idx] = (
+                f"[ADDITIONAL DATA NEEDED: No source material available "
+                f"for {section.title}.]"
+            )
+            continue
+
+        logger.info(
+            "Synthesizing Executive Summary %s with %d IB sources",
+            section.section_id, len(ib_sources),
+        )
+        jobs.append(_SynthesisJob(
+            section_id=section.section_id,
+            line_idx=line_idx,
+            label=f"exec_{section.section_id}",
+            system_prompt=EXEC_SUMMARY_SYSTEM,
+            user_prompt=_build_exec_summary_prompt(section, ib_sources, report_body),
+            fallback=(
+                f"[ADDITIONAL DATA NEEDED: Executive summary for "
+                f"{section.title} — synthesis failed.]"
+            ),
+            fallback_desc="placeholder",
+        ))
+
+    for job, content in zip(jobs, _run_synthesis_jobs(jobs, llm, cache)):
+        if content is None:
+            lines[job.line_idx] = job.fallback
+            continue
+        lines[job.line_idx] = content
+        logger.info(
+            "Filled Executive Summary %s (%d chars)",
+            job.section_id, len(content),
+        )
+
 
+def _build_exec_summary_prompt(
+    section: TemplateSection,
+    ib_sources: list[tuple[str, str]],
+    report_body: str,
+) -> str:
+    """Build the user prompt for an Executive Summary subsection.
+
+    The completed report body is identical for every subsection, so it
+    goes first to form a shared, provider-cacheable prompt prefix; the
+    per-subsection parts follow.
+    """
+    prompt_parts: list[str] = []
+
+    # Add relevant report body sections for additional context
+    if report_body.strip():
+        # Truncate report body to leave room for IB content
+        max_body = 15000 if ib_sources else 25000
+        body_text = report_body
+        if len(body_text) > max_body:
+            body_text = body_text[:max_body] + "\n[... truncated ...]"
+        prompt_parts.append("COMPLETED REPORT BODY (for additional context):")
+        prompt_parts.append(body_text)
+        prompt_parts.append("")
+
+    if ib_sources:
+        prompt_parts.append("SOURCE MATERIAL FROM INVESTIGATOR'S BROCHURE:")
+        for label, content in ib_sources:
+            # Truncate individual sources to stay within limits
+            if len(content) > 8000:
+                content = content[:8000] + "\n[... truncated ...]"
+            prompt_parts.append(f"\n--- {label} ---")
+            prompt_parts.append(content)
+        prompt_parts.append("")
+
+    if section.body:
+        prompt_parts.append(
+            "TEMPLATE GUIDANCE (for your guidance, do NOT "
+            "include these instructions in the output):"
+        )
+        prompt_parts.append(section.body)
+        prompt_parts.append("")
+
+    prompt_parts.append(f"SECTION: {section.section_id} — {section.title}")
+
+    return "\n".join(prompt_parts)
 
-def _append_raw_sources(lines: list[str], resolved: list) -> None:
-    """Append resolved sources in the legacy raw-paste format."""
+
+# Legacy raw-paste layout for resolved sources: a lone source gets a
+# "*Source:*" line, several get one "### From" subheading each.
+_SINGLE_SOURCE_TMPL = "*Source: {ref}*\n\n{content}\n"
+_MULTI_SOURCE_TMPL = "### From {ref}\n\n{content}\n"
+
+
+def _format_raw_sources(resolved: Sequence[ResolvedSource]) -> str:
+    """Render resolved sources in the legacy raw-paste format."""
     if len(resolved) == 1:
         rs = resolved[0]
-        lines.append(f"*Source: {rs.original_ref}*\n")
-        lines.append(f"{rs.content}\n")
-    else:
-        for rs in resolved:
-            lines.append(f"### From {rs.original_ref}\n")
-            lines.append(f"{rs.content}\n")
+        return _SINGLE_SOURCE_TMPL.format(ref=rs.original_ref, content=rs.content)
+    return "\n".join(
+        _MULTI_SOURCE_TMPL.format(ref=rs.original_ref, content=rs.content)
+        for rs in resolved
+    )
+
+
+# Namespace declaration shared by the prebuilt WordprocessingML snippets below.
+_NSDECL_W = nsdecls("w")
+
+# The four elements of a simple Word field, wrapped in a throwaway <w:r> so
+# they parse as one fragment; {code} is filled in (XML-escaped) per call.
+_FIELD_CODE_XML = (
+    f"<w:r {_NSDECL_W}>"
+    '<w:fldChar w:fldCharType="begin"/>'
+    '<w:instrText xml:space="preserve">{code}</w:instrText>'
+    '<w:fldChar w:fldCharType="separate"/>'
+    '<w:fldChar w:fldCharType="end"/>'
+    "</w:r>"
+)
 
 
 def _add_field_code(run, field_code: str) -> None:
     """Insert a Word field code (e.g. PAGE, NUMPAGES, TOC) into a run."""
-    from docx.oxml import OxmlElement
-    from docx.oxml.ns import qn
+    from xml.sax.saxutils import escape
+
+    from docx.oxml import parse_xml
+
+    fragment = parse_xml(_FIELD_CODE_XML.format(code=escape(field_code)))
+    run._r.extend(list(fragment))
 
-    fld_begin = OxmlElement("w:fldChar")
-    fld_begin.set(qn("w:fldCharType"), "begin")
 
-    instr = OxmlElement("w:instrText")
-    instr.set(qn("xml:space"), "preserve")
-    instr.text = field_code
+# Heading run properties applied to "Heading 1".."Heading 4" in _setup_document.
+_HEADING_RPR_XML = (
+    f"<w:rPr {_NSDECL_W}>"
+    '<w:rFonts w:ascii="Calibri" w:hAnsi="Calibri"/>'
+    '<w:color w:val="1F3A5F"/>'
+    "</w:rPr>"
+)
 
-    fld_sep = OxmlElement("w:fldChar")
-    fld_sep.set(qn("w:fldCharType"), "separate")
 
-    fld_end = OxmlElement("w:fldChar")
-    fld_end.set(qn("w:fldCharType"), "end")
+def _apply_heading_rpr(doc: Document) -> None:
+    """Apply the heading font and colour to each heading style's XML directly.
 
-    r = run._r
-    r.append(fld_begin)
-    r.append(instr)
-    r.append(fld_sep)
-    r.append(fld_end)
+    The template snippet is parsed once.  Its attributes are merged into
+    any existing ``rFonts``/``color`` elements, or a copy is inserted in
+    schema order.  The theme colour is dropped so the explicit colour
+    applies.  This matches what ``font.name`` / ``font.color.rgb`` do,
+    without the per-attribute python-docx descriptor round-trips.
+    """
+    from docx.oxml import parse_xml
+    from docx.oxml.ns import qn
+
+    template = parse_xml(_HEADING_RPR_XML)
+    theme_attrs = (qn("w:themeColor"), qn("w:themeShade"), qn("w:themeTint"))
+
+    for level in range(1, 5):
+        style_name = f"Heading {level}"
+        if style_name not in doc.styles:
+            continue
+        rpr = doc.styles[style_name].element.get_or_add_rPr()
+        for tpl in template:
+            existing = rpr.find(tpl.tag)
+            if existing is None:
+                local_name = tpl.tag.rsplit("}", 1)[-1]
+                getattr(rpr, f"_insert_{local_name}")(deepcopy(tpl))
+            else:
+                existing.attrib.update(tpl.attrib)
+                if existing.tag == qn("w:color"):
+                    for attr in theme_attrs:
+                        existing.attrib.pop(attr, None)
 
 
 def _setup_document(doc: Document) -> None:
@@ -534,12 +1060,7 @@ def _setup_document(doc: Document) -> None:
     style.paragraph_format.space_after = Pt(6)
 
     # --- Heading styles ---
-    for level in range(1, 5):
-        style_name = f"Heading {level}"
-        if style_name in doc.styles:
-            h_style = doc.styles[style_name]
-            h_style.font.name = "Calibri"
-            h_style.font.color.rgb = RGBColor(0x1F, 0x3A, 0x5F)
+    _apply_heading_rpr(doc)
 
     # --- Title page ---
     title_para = doc.add_paragraph()
@@ -599,110 +1120,169 @@ def _setup_document(doc: Document) -> None:
     run.italic = True
 
 
-def _add_rich_paragraph(doc: Document, text: str) -> None:
+# ---------------------------------------------------------------------------
+# Markdown → .docx
+# ---------------------------------------------------------------------------
+
+_HEADING_RE = re.compile(r"^(#{1,6})\s+(.*)")
+_BULLET_RE = re.compile(r"^[-*]\s+(.*)")
+_TABLE_SEP_RE = re.compile(r"^[\|\s\-:]+$")
+_PLACEHOLDER_PREFIXES = (
+    "[MANUAL INPUT REQUIRED:",
+    "[CONTENT NOT FOUND:",
+    "[ADDITIONAL DATA NEEDED:",
+)
+
+_HEADER_SHADE_XML = f'<w:shd {_NSDECL_W} w:fill="1F3A5F"/>'
+_ALT_SHADE_XML = f'<w:shd {_NSDECL_W} w:fill="F2F2F2"/>'
+
+
+def _inline_spans(text: str) -> list[tuple[str, str]]:
+    """Split *text* into ``(kind, text)`` spans for **bold** and *italic*.
+
+    *kind* is ``"plain"``, ``"bold"`` or ``"italic"``.  A single
+    left-to-right ``str.find`` scan: at each ``*`` a ``**bold**`` match is
+    tried first, then ``*italic*``; markers that do not close (or enclose
+    nothing) are kept as literal text.
+    """
+    spans: list[tuple[str, str]] = []
+    n = len(text)
+    plain_start = 0
+    i = text.find("*")
+    while i != -1:
+        if i + 1 < n and text[i + 1] == "*":
+            close = text.find("*", i + 2)
+            if close > i + 2 and close + 1 < n and text[close + 1] == "*":
+                if plain_start < i:
+                    spans.append(("plain", text[plain_start:i]))
+                spans.append(("bold", text[i + 2:close]))
+                plain_start = close + 2
+                i = text.find("*", plain_start)
+                continue
+        else:
+            close = text.find("*", i + 1)
+            if close > i + 1:
+                if plain_start < i:
+                    spans.append(("plain", text[plain_start:i]))
+                spans.append(("italic", text[i + 1:close]))
+                plain_start = close + 1
+                i = text.find("*", plain_start)
+                continue
+        i = text.find("*", i + 1)
+    if plain_start < n:
+        spans.append(("plain", text[plain_start:]))
+    return spans
+
+
+def _add_rich_paragraph(doc: Document, text: str, style=None):
     """Add a paragraph with inline markdown formatting (bold, italic).
 
     Handles **bold**, *italic*, and mixed formatting within a single
-    paragraph.
+    paragraph.  *style* is an optional paragraph style object (or name).
+    Returns the new paragraph.
     """
-    p = doc.add_paragraph()
-    # Split on bold/italic markers and create runs
-    parts = re.split(r"(\*\*[^*]+\*\*|\*[^*]+\*)", text)
-    for part in parts:
-        if not part:
-            continue
-        if part.startswith("**") and part.endswith("**"):
-            run = p.add_run(part[2:-2])
+    p = doc.add_paragraph(style=style)
+    if "*" not in text:
+        p.add_run(text)
+        return p
+    for kind, span in _inline_spans(text):
+        run = p.add_run(span)
+        if kind == "bold":
             run.bold = True
-        elif part.startswith("*") and part.endswith("*"):
-            run = p.add_run(part[1:-1])
+        elif kind == "italic":
             run.italic = True
-        else:
-            p.add_run(part)
+    return p
 
 
-def _add_markdown_table(doc: Document, lines: list[str], start_idx: int) -> int:
-    """Parse a markdown table starting at start_idx and add it to the doc.
+def _add_markdown_table(doc: Document, table_lines: list[str]) -> bool:
+    """Parse the stripped rows of a markdown table and add it to the doc.
 
-    Returns the index of the first line after the table.
+    Returns False (adding nothing) if the rows do not form a table.
     """
+    from docx.oxml import parse_xml
     from docx.shared import Pt, RGBColor
-    import docx.oxml
-
-    table_lines = []
-    idx = start_idx
-    while idx < len(lines) and "|" in lines[idx]:
-        table_lines.append(lines[idx].strip())
-        idx += 1
 
     if len(table_lines) < 2:
-        return start_idx
+        return False
 
     # Parse header
     header_cells = [c.strip() for c in table_lines[0].split("|") if c.strip()]
+    if not header_cells:
+        return False
 
     # Skip separator line (e.g. |---|---|)
-    data_start = 1
-    if data_start < len(table_lines) and re.match(r"^[\|\s\-:]+$", table_lines[data_start]):
-        data_start = 2
+    data_start = 2 if _TABLE_SEP_RE.match(table_lines[1]) else 1
 
-    # Parse data rows
-    data_rows = []
-    for line in table_lines[data_start:]:
-        cells = [c.strip() for c in line.split("|") if c.strip()]
-        if cells:
-            data_rows.append(cells)
+    # Shading elements are parsed once per table and copied into each cell
+    header_shade = parse_xml(_HEADER_SHADE_XML)
+    alt_shade = parse_xml(_ALT_SHADE_XML)
 
-    if not header_cells:
-        return start_idx
-
-    # Create table
+    # Create table; data rows are appended as they are parsed
     num_cols = len(header_cells)
-    table = doc.add_table(rows=1 + len(data_rows), cols=num_cols)
+    table = doc.add_table(rows=1, cols=num_cols)
     table.style = "Table Grid"
 
     # Header row
-    for i, cell_text in enumerate(header_cells):
-        if i < num_cols:
-            cell = table.rows[0].cells[i]
+    for cell, cell_text in zip(table.rows[0].cells, header_cells):
+        cell.text = cell_text
+        for paragraph in cell.paragraphs:
+            for run in paragraph.runs:
+                run.bold = True
+                run.font.size = Pt(10)
+                run.font.color.rgb = RGBColor(0xFF, 0xFF, 0xFF)
+        # Header shading
+        cell._tc.get_or_add_tcPr().append(deepcopy(header_shade))
+
+    # Data rows with alternating shading
+    row_idx = 0
+    for line in islice(table_lines, data_start, None):
+        row_data = [c.strip() for c in line.split("|") if c.strip()]
+        if not row_data:
+            continue
+        shade = row_idx % 2 == 0
+        for cell, cell_text in zip(table.add_row().cells, row_data):
             cell.text = cell_text
             for paragraph in cell.paragraphs:
                 for run in paragraph.runs:
-                    run.bold = True
                     run.font.size = Pt(10)
-            # Header shading
-            shading = docx.oxml.parse_xml(
-                f'<w:shd {docx.oxml.ns.nsdecls("w")} w:fill="1F3A5F"/>'
-            )
-            cell._tc.get_or_add_tcPr().append(shading)
-            for paragraph in cell.paragraphs:
-                for run in paragraph.runs:
-                    run.font.color.rgb = RGBColor(0xFF, 0xFF, 0xFF)
-
-    # Data rows with alternating shading
-    for row_idx, row_data in enumerate(data_rows):
-        for col_idx, cell_text in enumerate(row_data):
-            if col_idx < num_cols:
-                cell = table.rows[row_idx + 1].cells[col_idx]
-                cell.text = cell_text
-                for paragraph in cell.paragraphs:
-                    for run in paragraph.runs:
-                        run.font.size = Pt(10)
-                # Alternating row color
-                if row_idx % 2 == 0:
-                    shading = docx.oxml.parse_xml(
-                        f'<w:shd {docx.oxml.ns.nsdecls("w")} w:fill="F2F2F2"/>'
-                    )
-                    cell._tc.get_or_add_tcPr().append(shading)
+            # Alternating row color
+            if shade:
+                cell._tc.get_or_add_tcPr().append(deepcopy(alt_shade))
+        row_idx += 1
 
     # Add spacing after table
     doc.add_paragraph()
-    return idx
+    return True
+
+
+def _write_markdown(blocks: list[str], md_path: Path) -> None:
+    """Stream markdown blocks to *md_path* in ``assemble_markdown`` layout."""
+    with open(md_path, "w", encoding="utf-8", buffering=1 << 20) as f:
+        f.writelines(_iter_markdown_chunks(blocks))
 
 
-def _markdown_to_docx(md_content: str, output_path: Path) -> None:
+def _iter_markdown_chunks(blocks: list[str]) -> Iterator[str]:
+    """Yield *blocks* with their ``"\\n\\n"`` separators and the final newline."""
+    for i, block in enumerate(blocks):
+        if i:
+            yield "\n\n"
+        yield block
+    yield "\n"
+
+
+def _iter_markdown_lines(blocks: list[str]) -> Iterator[str]:
+    """Yield the lines of the document *blocks* form, without joining them."""
+    for i, block in enumerate(blocks):
+        if i:
+            yield ""
+        yield from block.split("\n")
+
+
+def _markdown_to_docx(lines: Iterable[str], output_path: Path) -> None:
     """Convert markdown text to a professional .docx file.
 
+    *lines* is consumed once, front to back, so it may be a generator.
+
     Produces a document with:
     - Title page with report name and confidentiality notice
     - Auto-updating Table of Contents
@@ -716,66 +1296,119 @@ def _markdown_to_docx(md_content: str, output_path: Path) -> None:
 
     doc = Document()
     _setup_document(doc)
+    # Resolve paragraph styles once rather than by name for every line
+    styles = {
+        name: doc.styles[name]
+        for name in ("List Bullet", "Heading 1", "Heading 2", "Heading 3", "Heading 4")
+    }
 
-    lines = md_content.split("\n")
-    i = 0
-    while i < len(lines):
-        stripped = lines[i].strip()
+    # Every line is stripped exactly once, here; the table gatherer and the
+    # replay path below work on already-stripped lines.
+    it = (raw.strip() for raw in lines)
+    line = next(it, None)
+    while line is not None:
+        stripped = line
 
         if not stripped:
-            i += 1
+            line = next(it, None)
             continue
 
-        # Skip the top-level title (already on the title page)
-        if stripped.startswith("# ") and not stripped.startswith("## "):
-            i += 1
-            continue
+        # Dispatch on the first character so plain prose (the common case)
+        # skips every block-level check below.
+        first = stripped[0]
 
-        # Heading lines
-        heading_match = re.match(r"^(#{1,6})\s+(.*)", stripped)
-        if heading_match:
-            heading_text = heading_match.group(2)
-            level = len(heading_match.group(1))
-            doc.add_heading(heading_text, level=min(level, 4))
-            i += 1
-            continue
+        if first == "#":
+            # Skip the top-level title (already on the title page)
+            if stripped.startswith("# "):
+                line = next(it, None)
+                continue
+
+            # Heading lines
+            heading_match = _HEADING_RE.match(stripped)
+            if heading_match:
+                heading_text = heading_match.group(2)
+                level = min(len(heading_match.group(1)), 4)
+                doc.add_paragraph(heading_text, style=styles[f"Heading {level}"])
+                line = next(it, None)
+                continue
 
-        # Markdown table
-        if "|" in stripped and stripped.startswith("|"):
-            new_i = _add_markdown_table(doc, lines, i)
-            if new_i > i:
-                i = new_i
+        # Markdown table: gather the run of "|" rows, looking one line ahead
+        elif first == "|":
+            table_lines = [stripped]
+            following = next(it, None)
+            while following is not None and "|" in following:
+                table_lines.append(following)
+                following = next(it, None)
+            if _add_markdown_table(doc, table_lines):
+                line = following
                 continue
+            # Not a table — handle this row as text and replay the rest
+            replay = table_lines[1:] if following is None else [*table_lines[1:], following]
+            it = chain(replay, it)
 
         # Bullet list items
-        bullet_match = re.match(r"^[-*]\s+(.*)", stripped)
-        if bullet_match:
-            _add_rich_paragraph(doc, bullet_match.group(1))
-            doc.paragraphs[-1].style = "List Bullet"
-            i += 1
-            continue
+        elif first in "-*":
+            bullet_match = _BULLET_RE.match(stripped)
+            if bullet_match:
+                _add_rich_paragraph(doc, bullet_match.group(1), style=styles["List Bullet"])
+                line = next(it, None)
+                continue
 
         # Placeholder lines — highlighted in yellow-ish with bold
-        if (
-            stripped.startswith("[MANUAL INPUT REQUIRED:")
-            or stripped.startswith("[CONTENT NOT FOUND:")
-            or stripped.startswith("[ADDITIONAL DATA NEEDED:")
-        ):
+        elif first == "[" and stripped.startswith(_PLACEHOLDER_PREFIXES):
             p = doc.add_paragraph()
             run = p.add_run(stripped)
             run.bold = True
             run.font.color.rgb = RGBColor(0xCC, 0x66, 0x00)
             run.font.size = Pt(10)
-            i += 1
+            line = next(it, None)
             continue
 
         # Normal paragraph with inline formatting
         _add_rich_paragraph(doc, stripped)
-        i += 1
+        line = next(it, None)
 
     doc.save(str(output_path))
 
 
+def _build_reference_docx(path: Path) -> None:
+    """Save a pandoc ``--reference-doc`` carrying the report's page setup and styles.
+
+    pandoc takes styles, margins, headers and footers from the reference
+    document and ignores its body, so the title page and TOC added by
+    ``_setup_document`` do not leak into the output.
+    """
+    doc = Document()
+    _setup_document(doc)
+    doc.save(str(path))
+
+
+def _markdown_to_docx_pandoc(md_path: Path, output_path: Path) -> bool:
+    """Convert *md_path* with pandoc; return False if pandoc is unavailable or fails."""
+    import subprocess
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        reference = Path(tmp) / "reference.docx"
+        _build_reference_docx(reference)
+        try:
+            subprocess.run(
+                ["pandoc", str(md_path), "-o", str(output_path), "--reference-doc", str(reference)],
+                check=True,
+                capture_output=True,
+            )
+        except FileNotFoundError:
+            logger.warning("pandoc not found — falling back to python-docx")
+            return False
+        except subprocess.CalledProcessError as e:
+            logger.warning(
+                "pandoc failed (%s) — falling back to python-docx",
+                e.stderr.decode("utf-8", "replace").strip() or e,
+            )
+            return False
+    return True
+
+
 def write_filled_template(
     template_sections: list[TemplateSection],
     ib_index: dict[str, str],
@@ -784,33 +1417,59 @@ def write_filled_template(
     dry_run: bool = False,
     pbrer_index: dict[str, str] | None = None,
     literature_results: dict[str, str] | None = None,
+    emit_docx: bool = True,
+    docx_engine: str = "python-docx",
+    use_cache: bool = True,
 ) -> dict[str, Path]:
-    """Write filled_template.md and filled_template.docx, return their paths.
+    """Write filled_template.md and (optionally) filled_template.docx, return their paths.
 
     When *llm* is provided, source material is synthesized into report-ready
     prose.  Pass ``dry_run=True`` to skip synthesis and use legacy raw-paste
-    behavior.
+    behavior.  Pass ``emit_docx=False`` to write only the markdown.  With
+    ``docx_engine="pandoc"`` the .docx is produced by pandoc (much faster on
+    large reports; no title page or TOC), falling back to python-docx when
+    pandoc is not installed.  ``use_cache=False`` bypasses ``llm.cache``
+    so every section is re-synthesized.
 
     Returns:
-        ``{"md": Path(...), "docx": Path(...)}``
+        ``{"md": Path(...), "docx": Path(...)}`` — ``"docx"`` only when emitted.
     """
     output_dir = Path(output_dir)
     ensure_dir(output_dir)
 
-    md_content = assemble_markdown(
+    blocks = _assemble_blocks(
         template_sections, ib_index,
         llm=llm,
         dry_run=dry_run,
         pbrer_index=pbrer_index,
         literature_results=literature_results,
+        use_cache=use_cache,
     )
 
     md_path = output_dir / "filled_template.md"
-    md_path.write_text(md_content, encoding="utf-8")
+    docx_path = output_dir / "filled_template.docx"
+    paths = {"md": md_path}
+
+    if emit_docx and docx_engine != "pandoc":
+        # python-docx works from the blocks, not the .md file, so the
+        # markdown write (I/O) overlaps with the docx build (lxml/CPU).
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            md_written = pool.submit(_write_markdown, blocks, md_path)
+            _markdown_to_docx(_iter_markdown_lines(blocks), docx_path)
+            md_written.result()
+        logger.info("Wrote filled markdown template to %s", md_path)
+        logger.info("Wrote filled DOCX template to %s", docx_path)
+        paths["docx"] = docx_path
+        return paths
+
+    _write_markdown(blocks, md_path)
     logger.info("Wrote filled markdown template to %s", md_path)
+    if not emit_docx:
+        return paths
 
-    docx_path = output_dir / "filled_template.docx"
-    _markdown_to_docx(md_content, docx_path)
+    # pandoc reads the written .md, so it must run after the write
+    if not _markdown_to_docx_pandoc(md_path, docx_path):
+        _markdown_to_docx(_iter_markdown_lines(blocks), docx_path)
     logger.info("Wrote filled DOCX template to %s", docx_path)
-
-    return {"md": md_path, "docx": docx_path}
+    paths["docx"] = docx_path
+    return paths
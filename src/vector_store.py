@@ -7,56 +7,290 @@ and text chunks. Supports caching to avoid redundant API calls.
 from __future__ import annotations
 
 import hashlib
+import io
 import json
+import time
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Sequence
 
 import faiss
 import numpy as np
 
 from .config import Config
+from .embedding_cache import EmbeddingCache
+from .openai_client import retry_transient
 from .utils import ensure_dir, logger
 
+# HNSW graph parameters: neighbours per node, and build / query beam widths.
+_HNSW_M = 32
+_HNSW_EF_CONSTRUCTION = 200
+_HNSW_EF_SEARCH_MIN = 64
+
+# Vectors indexed before an 8-bit index is trained.  The scalar quantizer
+# learns a per-dimension value range from its training set and clamps
+# anything outside it, so it needs a sample broad enough to cover the
+# corpus; until then vectors are stored (and searched) at full precision.
+_SQ_MIN_TRAIN = 1024
+
+
+@retry_transient
+def _create_embeddings(client: object, texts: list[str], model: str):
+    """Call the embeddings endpoint, retrying transient errors."""
+    return client.embeddings.create(input=texts, model=model)
+
+
+def _import_msgpack():
+    """Return the ``msgpack`` module, or None if it is not installed."""
+    try:
+        import msgpack
+    except ImportError:
+        return None
+    return msgpack
+
+
+def _text_seed(text: str) -> int:
+    """64-bit RNG seed derived from *text*."""
+    digest = hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def _id_selector(ids: list[int]) -> faiss.IDSelector:
+    """Return a FAISS selector for the ascending, distinct *ids*.
+
+    Documents of one source type are usually added together, so their
+    ids form a contiguous block that a range test covers without
+    building a hash set.
+    """
+    if ids[-1] - ids[0] + 1 == len(ids):
+        return faiss.IDSelectorRange(ids[0], ids[-1] + 1)
+    return faiss.IDSelectorBatch(np.asarray(ids, dtype="int64"))
+
+
+class _LazyMetadata(Sequence[dict]):
+    """Metadata read from a ``.meta.jsonl`` file, parsed one entry at a time.
+
+    Search only touches the metadata of its hits, so a large index does
+    not pay to decode every entry on load.
+    """
+
+    def __init__(self, lines: list[bytes]) -> None:
+        self._lines = lines
+        self._parsed: dict[int, dict] = {}
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    def __getitem__(self, idx):  # type: ignore[override]
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        if idx < 0:
+            idx += len(self._lines)
+        entry = self._parsed.get(idx)
+        if entry is None:
+            entry = self._parsed[idx] = json.loads(self._lines[idx])
+        return entry
+
 
 class VectorStore:
-    """Manages embeddings and FAISS index for semantic search."""
+    """Manages embeddings and FAISS index for semantic search.
+
+    ``add_documents`` buffers texts and embeds them in batches of at least
+    ``flush_threshold``; pending texts are embedded and indexed by
+    :meth:`flush`, which ``search`` and ``save`` call automatically.
+    """
+
+    flush_threshold = 256
 
     def __init__(self, config: Config, openai_client: object | None = None):
         self.config = config
         self._openai_client = openai_client
         self.dimension = config.embedding_dim
-        # Use inner product after L2-normalizing to get cosine similarity
-        self.index: faiss.IndexFlatIP = faiss.IndexFlatIP(self.dimension)
-        self.metadata: list[dict] = []
+        self.index: faiss.Index = self._new_index(quantize=False)
+        # Set while quantize_index waits for _SQ_MIN_TRAIN vectors.
+        self._quantize_pending = config.quantize_index
+        self.metadata: Sequence[dict] = []
+        # Set when the index is memory-mapped from disk by load().
+        self._readonly = False
+        # source_type -> ids of the vectors carrying it
+        self._ids_by_source: dict[str, list[int]] = {}
+        self._pending_texts: list[str] = []
+        self._pending_meta: list[dict] = []
         self._cache_dir = ensure_dir(config.vector_index_dir)
+        self._embedding_cache: EmbeddingCache | None = None
+        if config.embedding_cache and not config.dry_run and openai_client is not None:
+            self._embedding_cache = EmbeddingCache(
+                self._cache_dir, config.embedding_model, self.dimension
+            )
+
+    def _new_index(self, quantize: bool) -> faiss.Index:
+        """Create an empty index of the configured ``ann_index_type``.
+
+        Vectors are L2-normalized, so inner product equals cosine similarity.
+        ``"flat"`` (the default) is exact brute force, which is as fast as
+        anything at the tens to thousands of vectors the pipeline indexes;
+        ``"hnsw"`` gives approximate search in roughly logarithmic time for
+        corpora large enough to need it.
+        With *quantize*, vectors are stored as 8-bit scalars (a quarter
+        of the memory); such indexes must be trained before use.
+        """
+        ann_type = self.config.ann_index_type
+        if ann_type not in ("hnsw", "flat"):
+            raise ValueError(f"Unknown ann_index_type: {ann_type!r}")
+        ip = faiss.METRIC_INNER_PRODUCT
+        sq8 = faiss.ScalarQuantizer.QT_8bit
+        if ann_type == "flat":
+            if quantize:
+                return faiss.IndexScalarQuantizer(self.dimension, sq8, ip)
+            return faiss.IndexFlatIP(self.dimension)
+        if quantize:
+            index = faiss.IndexHNSWSQ(self.dimension, sq8, _HNSW_M, ip)
+        else:
+            index = faiss.IndexHNSWFlat(self.dimension, _HNSW_M, ip)
+        index.hnsw.efConstruction = _HNSW_EF_CONSTRUCTION
+        return index
 
     def _get_embeddings(self, texts: list[str]) -> np.ndarray:
-        """Get embeddings from OpenAI API, batching in groups of 100."""
+        """Get L2-normalized embeddings, reusing vectors cached on disk."""
         if self.config.dry_run or self._openai_client is None:
-            # Return random unit vectors for dry-run / testing
-            rng = np.random.default_rng(42)
-            vecs = rng.standard_normal((len(texts), self.dimension)).astype("float32")
+            # Random unit vectors for dry-run / testing, seeded per text so
+            # equal texts embed equally wherever they appear.
+            vecs = np.empty((len(texts), self.dimension), dtype="float32")
+            for i, text in enumerate(texts):
+                rng = np.random.default_rng(_text_seed(text))
+                vecs[i] = rng.standard_normal(self.dimension, dtype=np.float32)
             faiss.normalize_L2(vecs)
             return vecs
 
-        from openai import OpenAI
+        # Texts are truncated before embedding, so key by the truncated
+        # text; a text repeated within the call is embedded once.
+        keys = [t[:8000] for t in texts]
+        unique = list(dict.fromkeys(keys))
+        cache = self._embedding_cache
+        cached = cache.get_many(unique) if cache is not None else {}
+        misses = [i for i in range(len(unique)) if i not in cached]
+        if cached:
+            logger.info("Embedding cache: %d/%d texts served from cache", len(cached), len(unique))
+        vecs = np.empty((len(unique), self.dimension), dtype="float32")
+        for i, vec in cached.items():
+            vecs[i] = vec
+        if misses:
+            fresh = self._fetch_embeddings([unique[i] for i in misses])
+            vecs[misses] = fresh
+            if cache is not None:
+                cache.put_many([unique[i] for i in misses], fresh)
+
+        if len(unique) == len(keys):
+            return vecs
+        row = {key: i for i, key in enumerate(unique)}
+        return vecs[[row[key] for key in keys]]
+
+    def _fetch_embeddings(self, texts: list[str]) -> np.ndarray:
+        """Get embeddings from OpenAI API, batching in groups of 100.
+
+        Uses the client passed to the constructor, so its connection pool
+        is shared with the chat calls instead of rebuilt per request.
+        """
+        if self.config.embedding_batch_mode:
+            return self._get_embeddings_batch(texts)
 
-        client = OpenAI(api_key=self.config.openai_api_key)
-        all_embeddings: list[list[float]] = []
+        client = self._openai_client
+        vecs = np.empty((len(texts), self.dimension), dtype="float32")
         batch_size = 100
 
         for i in range(0, len(texts), batch_size):
             batch = texts[i : i + batch_size]
             # Truncate very long texts to avoid token limits
             batch = [t[:8000] for t in batch]
-            response = client.embeddings.create(
-                input=batch,
-                model=self.config.embedding_model,
+            response = _create_embeddings(client, batch, self.config.embedding_model)
+            for j, item in enumerate(response.data):
+                vecs[i + j] = item.embedding
+
+        faiss.normalize_L2(vecs)
+        return vecs
+
+    def _get_embeddings_batch(self, texts: list[str], poll_interval: float = 30.0) -> np.ndarray:
+        """Get embeddings through the OpenAI Batch API, 100 texts per request.
+
+        Batch embeddings are billed at about half the synchronous rate but
+        may take up to 24h.  The batch ID is recorded next to the index so
+        a restarted run with the same texts resumes polling instead of
+        submitting again.  Requests missing from the batch output are
+        embedded synchronously.
+        """
+        client = self._openai_client
+        batch_size = 100
+        chunks = [
+            [t[:8000] for t in texts[i : i + batch_size]]
+            for i in range(0, len(texts), batch_size)
+        ]
+        custom_ids = [f"emb_{n:05d}" for n in range(len(chunks))]
+        texts_hash = self.content_hash(texts)
+        state_path = self._cache_dir / "embedding_batch.json"
+
+        batch_id = None
+        if state_path.exists():
+            state = json.loads(state_path.read_text(encoding="utf-8"))
+            if state.get("content_hash") == texts_hash:
+                batch_id = state["batch_id"]
+                logger.info("Resuming embedding batch %s", batch_id)
+
+        if batch_id is None:
+            lines = [
+                json.dumps({
+                    "custom_id": custom_id,
+                    "method": "POST",
+                    "url": "/v1/embeddings",
+                    "body": {"input": chunk, "model": self.config.embedding_model},
+                })
+                for custom_id, chunk in zip(custom_ids, chunks)
+            ]
+            payload = io.BytesIO("\n".join(lines).encode("utf-8"))
+            payload.name = "embedding_requests.jsonl"
+            input_file = client.files.create(file=payload, purpose="batch")
+            batch_id = client.batches.create(
+                input_file_id=input_file.id,
+                endpoint="/v1/embeddings",
+                completion_window="24h",
+            ).id
+            state_path.write_text(
+                json.dumps({"batch_id": batch_id, "content_hash": texts_hash}),
+                encoding="utf-8",
             )
-            for item in response.data:
-                all_embeddings.append(item.embedding)
+            logger.info("Submitted embedding batch %s (%d texts)", batch_id, len(texts))
+
+        while True:
+            batch = client.batches.retrieve(batch_id)
+            if batch.status == "completed":
+                break
+            if batch.status in ("failed", "expired", "cancelled"):
+                state_path.unlink(missing_ok=True)
+                raise RuntimeError(f"Batch {batch_id} ended with status '{batch.status}'")
+            logger.debug("  Batch %s status=%s — waiting", batch_id, batch.status)
+            time.sleep(poll_interval)
+
+        results: dict[str, list[list[float]]] = {}
+        if batch.output_file_id:
+            output = client.files.content(batch.output_file_id).text
+            for line in output.splitlines():
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                response = record.get("response") or {}
+                if response.get("status_code") != 200:
+                    continue
+                data = sorted(response["body"]["data"], key=lambda item: item["index"])
+                results[record["custom_id"]] = [item["embedding"] for item in data]
+        state_path.unlink(missing_ok=True)
+
+        vecs = np.empty((len(texts), self.dimension), dtype="float32")
+        for n, (custom_id, chunk) in enumerate(zip(custom_ids, chunks)):
+            embeddings = results.get(custom_id)
+            if embeddings is None or len(embeddings) != len(chunk):
+                logger.warning("Embedding batch missing %s — embedding synchronously", custom_id)
+                response = _create_embeddings(client, chunk, self.config.embedding_model)
+                embeddings = [item.embedding for item in response.data]
+            vecs[n * batch_size : n * batch_size + len(chunk)] = embeddings
 
-        vecs = np.array(all_embeddings, dtype="float32")
         faiss.normalize_L2(vecs)
         return vecs
 
@@ -66,30 +300,58 @@ class VectorStore:
         metadata: list[dict],
         source_type: str,
     ) -> None:
-        """Add documents to the index with metadata.
+        """Queue documents for the index with metadata.
 
         Each metadata dict is augmented with 'source_type' for filtering.
+        Embedding is deferred until ``flush_threshold`` texts are pending
+        so that small calls share embedding requests.
         """
         if not texts:
             return
 
+        if self._readonly:
+            raise RuntimeError("Cannot add documents to a memory-mapped index loaded from disk")
+
         if len(texts) != len(metadata):
             raise ValueError(
                 f"texts ({len(texts)}) and metadata ({len(metadata)}) must have same length"
             )
 
         # Augment metadata with source_type
-        enriched = [{**m, "source_type": source_type} for m in metadata]
+        self._pending_texts.extend(texts)
+        self._pending_meta.extend({**m, "source_type": source_type} for m in metadata)
+        if len(self._pending_texts) >= self.flush_threshold:
+            self.flush()
 
+    def flush(self) -> None:
+        """Embed and index all pending documents."""
+        if not self._pending_texts:
+            return
+
+        texts, self._pending_texts = self._pending_texts, []
+        metadata, self._pending_meta = self._pending_meta, []
         embeddings = self._get_embeddings(texts)
+        start = self.index.ntotal
         self.index.add(embeddings)
-        self.metadata.extend(enriched)
-        logger.info(
-            "Added %d documents (source_type=%s), total=%d",
-            len(texts),
-            source_type,
-            self.index.ntotal,
-        )
+        self.metadata.extend(metadata)
+        for offset, meta in enumerate(metadata):
+            self._ids_by_source.setdefault(meta["source_type"], []).append(start + offset)
+        logger.info("Added %d documents, total=%d", len(texts), self.index.ntotal)
+        if self._quantize_pending and self.index.ntotal >= _SQ_MIN_TRAIN:
+            self._quantize()
+
+    def _quantize(self) -> None:
+        """Rebuild the index with 8-bit storage, trained on every vector so far.
+
+        Ids are positions, so re-adding the vectors in order keeps them.
+        """
+        vecs = self.index.reconstruct_n(0, self.index.ntotal)
+        index = self._new_index(quantize=True)
+        index.train(vecs)
+        index.add(vecs)
+        self.index = index
+        self._quantize_pending = False
+        logger.info("Quantized vector index to 8 bits (%d vectors)", index.ntotal)
 
     def search(
         self,
@@ -101,62 +363,153 @@ class VectorStore:
 
         Returns a list of dicts with 'metadata' and 'score' keys,
         sorted by descending score. If filter_source is given, only
-        returns results with matching source_type.
+        returns results with matching source_type; the restriction is
+        applied inside FAISS, so up to k matching results come back.
         """
-        if self.index.ntotal == 0:
+        return self.search_many([query], k, filter_source)[0]
+
+    def search_many(
+        self,
+        queries: list[str],
+        k: int = 5,
+        filter_source: Optional[str] = None,
+    ) -> list[list[dict]]:
+        """Search for several queries at once.
+
+        All queries are embedded together and searched with one FAISS
+        call over the ``(len(queries), dim)`` matrix.  Returns one result
+        list per query, each as :meth:`search` would return it.
+        """
+        if not queries:
             return []
+        scores, indices = self.search_raw(queries, k, filter_source)
+        return [
+            [
+                {"metadata": self.metadata[idx], "score": float(score)}
+                for score, idx in zip(row_scores, row_indices)
+                if idx >= 0
+            ]
+            for row_scores, row_indices in zip(scores, indices)
+        ]
 
-        query_vec = self._get_embeddings([query])
-
-        # Search more than k if filtering, to ensure enough results after filter
-        search_k = min(k * 3, self.index.ntotal) if filter_source else min(k, self.index.ntotal)
-        scores, indices = self.index.search(query_vec, search_k)
-
-        results: list[dict] = []
-        for score, idx in zip(scores[0], indices[0]):
-            if idx < 0:
-                continue
-            meta = self.metadata[idx]
-            if filter_source and meta.get("source_type") != filter_source:
-                continue
-            results.append({"metadata": meta, "score": float(score)})
-            if len(results) >= k:
-                break
+    def search_raw(
+        self,
+        queries: list[str],
+        k: int = 5,
+        filter_source: Optional[str] = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Search without building result dicts.
+
+        Returns FAISS's ``(scores, ids)`` arrays, each of shape
+        ``(len(queries), k')`` with ``k' <= k``.  Ids index
+        :attr:`metadata`; ``-1`` pads rows with fewer hits.  For callers
+        that rerank or filter further before touching metadata.
+        """
+        self.flush()
+        n = len(queries)
+        no_hits = (np.empty((n, 0), dtype="float32"), np.empty((n, 0), dtype="int64"))
+        if n == 0 or self.index.ntotal == 0:
+            return no_hits
 
-        return results
+        sel = None
+        if filter_source:
+            ids = self._ids_by_source.get(filter_source)
+            if not ids:
+                return no_hits
+            sel = _id_selector(ids)
+
+        query_vecs = self._get_embeddings(queries)
+        search_k = min(k, self.index.ntotal)
+        if isinstance(self.index, faiss.IndexHNSW):
+            params = faiss.SearchParametersHNSW(
+                sel=sel, efSearch=max(_HNSW_EF_SEARCH_MIN, search_k * 4)
+            )
+        else:
+            params = faiss.SearchParameters(sel=sel)
+        return self.index.search(query_vecs, search_k, params=params)
 
     def save(self, name: str) -> None:
-        """Persist index and metadata to disk."""
-        index_path = self._cache_dir / f"{name}.faiss"
-        meta_path = self._cache_dir / f"{name}.meta.json"
+        """Persist index, metadata, and the source_type -> ids map to disk.
 
+        Metadata is written as MessagePack when ``msgpack`` is installed
+        (smaller, and decoded in C), otherwise as line-delimited JSON.
+        """
+        self.flush()
+        index_path = self._cache_dir / f"{name}.faiss"
         faiss.write_index(self.index, str(index_path))
-        meta_path.write_text(
-            json.dumps(self.metadata, indent=2), encoding="utf-8"
-        )
+
+        msgpack = _import_msgpack()
+        for stale in (f"{name}.meta.msgpack", f"{name}.idx.msgpack",
+                      f"{name}.meta.jsonl", f"{name}.idx.json"):
+            (self._cache_dir / stale).unlink(missing_ok=True)
+        if msgpack is not None:
+            (self._cache_dir / f"{name}.meta.msgpack").write_bytes(
+                msgpack.packb(list(self.metadata), use_bin_type=True)
+            )
+            (self._cache_dir / f"{name}.idx.msgpack").write_bytes(
+                msgpack.packb(self._ids_by_source, use_bin_type=True)
+            )
+        else:
+            (self._cache_dir / f"{name}.meta.jsonl").write_text(
+                "".join(json.dumps(m) + "\n" for m in self.metadata), encoding="utf-8"
+            )
+            (self._cache_dir / f"{name}.idx.json").write_text(
+                json.dumps(self._ids_by_source), encoding="utf-8"
+            )
         logger.info("Saved vector index '%s' (%d vectors)", name, self.index.ntotal)
 
     def load(self, name: str) -> bool:
-        """Load index from disk. Returns True if loaded successfully."""
+        """Load index from disk. Returns True if loaded successfully.
+
+        The index is memory-mapped read-only, so only the pages a search
+        touches are read; the loaded store cannot take new documents.
+        """
         index_path = self._cache_dir / f"{name}.faiss"
-        meta_path = self._cache_dir / f"{name}.meta.json"
+        packed_path = self._cache_dir / f"{name}.meta.msgpack"
+        jsonl_path = self._cache_dir / f"{name}.meta.jsonl"
+        msgpack = _import_msgpack() if packed_path.exists() else None
 
-        if not index_path.exists() or not meta_path.exists():
+        if not index_path.exists() or (msgpack is None and not jsonl_path.exists()):
             return False
 
+        # Read everything before touching the store, so a failed load
+        # leaves it (and any pending documents) as it was.
         try:
-            self.index = faiss.read_index(str(index_path))
-            self.metadata = json.loads(meta_path.read_text(encoding="utf-8"))
-            logger.info(
-                "Loaded vector index '%s' (%d vectors)", name, self.index.ntotal
+            index = faiss.read_index(
+                str(index_path), faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY
             )
-            return True
+            if msgpack is not None:
+                metadata = msgpack.unpackb(packed_path.read_bytes(), raw=False)
+                ids_by_source = msgpack.unpackb(
+                    (self._cache_dir / f"{name}.idx.msgpack").read_bytes(), raw=False
+                )
+            else:
+                metadata = _LazyMetadata(jsonl_path.read_bytes().splitlines())
+                ids_by_source = json.loads(
+                    (self._cache_dir / f"{name}.idx.json").read_text(encoding="utf-8")
+                )
         except Exception as e:
             logger.warning("Failed to load vector index '%s': %s", name, e)
             return False
 
+        self.index = index
+        self.metadata = metadata
+        self._ids_by_source = ids_by_source
+        self._pending_texts, self._pending_meta = [], []
+        self._quantize_pending = False
+        self._readonly = True
+        logger.info("Loaded vector index '%s' (%d vectors)", name, index.ntotal)
+        return True
+
     @staticmethod
     def content_hash(texts: list[str]) -> str:
-        """SHA256 hash of all texts for cache invalidation."""
-        combined = "\n".join(texts)
-        return hashlib.sha256(combined.encode()).hexdigest()[:16]
+        """16-hex-digit BLAKE2b hash of all texts for cache invalidation.
+
+        Each text is NUL-terminated, so list boundaries are part of the
+        hash (``["a\\nb"]`` and ``["a", "b"]`` differ).
+        """
+        h = hashlib.blake2b(digest_size=8)
+        for text in texts:
+            h.update(text.encode("utf-8"))
+            h.update(b"\x00")
+        return h.hexdigest()
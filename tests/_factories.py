@@ -0,0 +1,22 @@
+"""Unvalidated model factories for test fixtures.
+
+``model_construct`` skips field validation, which these statically
+correct fixtures do not need.  Each model keeps at least one test that
+goes through the validating constructor.
+"""
+
+from __future__ import annotations
+
+from src.models import DSRSection, MappingTableEntry, TemplateSection
+
+
+def template_section(**kwargs) -> TemplateSection:
+    return TemplateSection.model_construct(**kwargs)
+
+
+def dsr_section(**kwargs) -> DSRSection:
+    return DSRSection.model_construct(**kwargs)
+
+
+def mapping_entry(**kwargs) -> MappingTableEntry:
+    return MappingTableEntry.model_construct(**kwargs)
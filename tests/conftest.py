@@ -0,0 +1,39 @@
+"""Shared pytest fixtures."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def sample_docx(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """A template .docx with two paragraphs and a mapping table.
+
+    Built once per session: saving a document (zip + lxml) dominates
+    the cost of the tests that read it.
+    """
+    docx = pytest.importorskip("docx")
+
+    doc = docx.Document()
+    doc.add_paragraph("1.1 Introduction")
+    doc.add_paragraph("Some body text here")
+    table = doc.add_table(rows=2, cols=3)
+    table.cell(0, 0).text = "DSR Section"
+    table.cell(0, 1).text = "Content"
+    table.cell(0, 2).text = "Source Documents"
+    table.cell(1, 0).text = "1.2.1"
+    table.cell(1, 1).text = "Drug Background"
+    table.cell(1, 2).text = "IB 2.3"
+    path = tmp_path_factory.mktemp("template") / "template.docx"
+    doc.save(str(path))
+    return path
+
+
+@pytest.fixture(scope="session")
+def sample_docx_content(sample_docx: Path) -> tuple[str, list[list[list[str]]]]:
+    """``_read_template_content`` of :func:`sample_docx`, read once."""
+    from src.template_parser import _read_template_content
+
+    return _read_template_content(sample_docx)
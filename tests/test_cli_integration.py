@@ -62,6 +62,13 @@ class TestBuildParser:
         assert args.pbrer is None
         assert args.literature is None
         assert args.no_vectors is False
+        assert args.no_quantize is False
+        assert args.batch is False
+        assert args.batch_embeddings is False
+        assert args.llm_concurrency == 10
+        assert args.no_synth_cache is False
+        assert args.no_docx is False
+        assert args.docx_engine == "python-docx"
 
     def test_from_pdf_has_pbrer_arg(self) -> None:
         parser = build_parser()
@@ -129,6 +136,44 @@ class TestBuildParser:
         assert args.no_vectors is True
         assert args.template == "template.docx"
 
+    def test_from_pdf_has_batch_arg(self) -> None:
+        parser = build_parser()
+        args = parser.parse_args([
+            "from-pdf",
+            "--pdf", "dsr.pdf",
+            "--template", "template.txt",
+            "--ib", "ib.pdf",
+            "--scope", "1.1-1.2",
+            "--batch",
+        ])
+        assert args.batch is True
+
+    def test_from_pdf_has_no_synth_cache_arg(self) -> None:
+        parser = build_parser()
+        args = parser.parse_args([
+            "from-pdf",
+            "--pdf", "dsr.pdf",
+            "--template", "template.txt",
+            "--ib", "ib.pdf",
+            "--scope", "1.1-1.2",
+            "--no-synth-cache",
+        ])
+        assert args.no_synth_cache is True
+
+    def test_from_pdf_has_docx_args(self) -> None:
+        parser = build_parser()
+        args = parser.parse_args([
+            "from-pdf",
+            "--pdf", "dsr.pdf",
+            "--template", "template.txt",
+            "--ib", "ib.pdf",
+            "--scope", "1.1-1.2",
+            "--no-docx",
+            "--docx-engine", "pandoc",
+        ])
+        assert args.no_docx is True
+        assert args.docx_engine == "pandoc"
+
 
 class TestAddCommonEnhancementArgs:
     """Verify the helper function adds the right arguments."""
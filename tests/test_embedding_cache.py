@@ -0,0 +1,35 @@
+"""Tests for embedding_cache module."""
+
+from __future__ import annotations
+
+import numpy as np
+
+from src.embedding_cache import EmbeddingCache
+
+
+class TestEmbeddingCache:
+    def test_round_trip(self, tmp_path):
+        cache = EmbeddingCache(tmp_path, "m", 4)
+        vecs = np.arange(8, dtype="float32").reshape(2, 4)
+        cache.put_many(["a", "b"], vecs)
+        hits = cache.get_many(["b", "c", "a"])
+        assert set(hits) == {0, 2}
+        np.testing.assert_array_equal(hits[0], vecs[1])
+        np.testing.assert_array_equal(hits[2], vecs[0])
+
+    def test_persists_across_instances(self, tmp_path):
+        EmbeddingCache(tmp_path, "m", 4).put_many(["a"], np.ones((1, 4), dtype="float32"))
+        cache = EmbeddingCache(tmp_path, "m", 4)
+        np.testing.assert_array_equal(cache.get_many(["a"])[0], np.ones(4))
+        cache.put_many(["b"], np.full((1, 4), 2, dtype="float32"))
+        np.testing.assert_array_equal(cache.get_many(["b"])[0], np.full(4, 2))
+
+    def test_model_is_part_of_key(self, tmp_path):
+        EmbeddingCache(tmp_path, "m1", 4).put_many(["a"], np.ones((1, 4), dtype="float32"))
+        assert EmbeddingCache(tmp_path, "m2", 4).get_many(["a"]) == {}
+
+    def test_duplicates_stored_once(self, tmp_path):
+        cache = EmbeddingCache(tmp_path, "m", 4)
+        cache.put_many(["a", "a"], np.ones((2, 4), dtype="float32"))
+        cache.put_many(["a"], np.ones((1, 4), dtype="float32"))
+        assert (tmp_path / "emb_cache_4.f32").stat().st_size == 4 * 4
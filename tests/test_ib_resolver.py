@@ -2,13 +2,17 @@
 
 from __future__ import annotations
 
+import dataclasses
+
 import pytest
 
 from src.ib_resolver import (
     ResolvedSource,
     _expand_compound_refs,
     classify_source,
+    iter_resolve_sources,
     resolve_sources,
+    resolve_sources_bulk,
 )
 
 
@@ -20,95 +24,56 @@ from src.ib_resolver import (
 class TestClassifySource:
     """Tests for classify_source()."""
 
-    def test_ib_with_section_number(self):
-        assert classify_source("IB 2.3") == ("ib", "2.3")
-
-    def test_ib_with_deep_section_number(self):
-        assert classify_source("IB 4.3.3") == ("ib", "4.3.3")
-
-    def test_ib_section_keyword(self):
-        assert classify_source("IB Section 4.3.3") == ("ib", "4.3.3")
-
-    def test_ib_single_digit_section(self):
-        assert classify_source("IB 6") == ("ib", "6")
-
-    def test_bare_ib(self):
-        assert classify_source("IB") == ("ib", None)
-
-    def test_case_insensitive_lower(self):
-        assert classify_source("ib 2.3") == ("ib", "2.3")
-
-    def test_case_insensitive_mixed(self):
-        assert classify_source("Ib Section 1.2") == ("ib", "1.2")
-
-    def test_extra_spaces(self):
-        assert classify_source("  IB   2.3  ") == ("ib", "2.3")
-
-    def test_extra_spaces_section_keyword(self):
-        assert classify_source("  IB   Section   6.1  ") == ("ib", "6.1")
-
-    def test_bare_ib_with_spaces(self):
-        assert classify_source("  IB  ") == ("ib", None)
-
-    def test_pbrer(self):
-        assert classify_source("PBRER Section 5") == ("pbrer", "5")
-
-    def test_pbrer_lowercase(self):
-        assert classify_source("pbrer") == ("pbrer", None)
-
-    def test_pbrer_with_dotted_section(self):
-        assert classify_source("PBRER 5.1.2") == ("pbrer", "5.1.2")
-
-    def test_pbrer_section_keyword(self):
-        assert classify_source("PBRER Section 1.3") == ("pbrer", "1.3")
+    @pytest.mark.parametrize("raw,expected", [
+        # IB sections
+        ("IB 2.3", ("ib", "2.3")),
+        ("IB 4.3.3", ("ib", "4.3.3")),
+        ("IB Section 4.3.3", ("ib", "4.3.3")),
+        ("IB 6", ("ib", "6")),
+        ("ib 2.3", ("ib", "2.3")),
+        ("Ib Section 1.2", ("ib", "1.2")),
+        ("  IB   2.3  ", ("ib", "2.3")),
+        ("  IB   Section   6.1  ", ("ib", "6.1")),
+        ("IB Section 2.3 (Pharmacology/MoA)", ("ib", "2.3")),
+        ("IB Sections 1.2", ("ib", "1.2")),
+        # Bare IB
+        ("IB", ("ib", None)),
+        ("  IB  ", ("ib", None)),
+        # IB tables
+        ("IB Table 30", ("ib_table", "30")),
+        ("ib table 5", ("ib_table", "5")),
+        # PBRER
+        ("PBRER Section 5", ("pbrer", "5")),
+        ("pbrer", ("pbrer", None)),
+        ("PBRER 5.1.2", ("pbrer", "5.1.2")),
+        ("PBRER Section 1.3", ("pbrer", "1.3")),
+        ("PBRER Section 5 (Safety)", ("pbrer", "5")),
+        ("PBRER Sections 1.3", ("pbrer", "1.3")),
+        # External
+        ("UpToDate", ("external", None)),
+        ("Medline", ("external", None)),
+        ("Embase", ("external", None)),
+        ("Company safety database", ("external", None)),
+        ("Signal assessment", ("external", None)),
+        ("uptodate", ("external", None)),
+        ("MEDLINE", ("external", None)),
+        ("company safety database", ("external", None)),
+        # Unknown
+        ("Some random text", ("unknown", None)),
+        ("", ("unknown", None)),
+    ])
+    def test_classify(self, raw, expected):
+        assert classify_source(raw) == expected
 
     def test_pbrer_bare_with_trailing_text(self):
         # "PBRER: some notes" should still be classified as pbrer (bare)
         assert classify_source("PBRER: some notes")[0] == "pbrer"
 
-    def test_uptodate(self):
-        assert classify_source("UpToDate") == ("external", None)
-
-    def test_medline(self):
-        assert classify_source("Medline") == ("external", None)
-
-    def test_embase(self):
-        assert classify_source("Embase") == ("external", None)
-
-    def test_company_safety_database(self):
-        assert classify_source("Company safety database") == ("external", None)
-
-    def test_signal_assessment(self):
-        assert classify_source("Signal assessment") == ("external", None)
-
-    def test_external_case_insensitive(self):
-        assert classify_source("uptodate") == ("external", None)
-        assert classify_source("MEDLINE") == ("external", None)
-        assert classify_source("company safety database") == ("external", None)
-
-    def test_unknown_source(self):
-        assert classify_source("Some random text") == ("unknown", None)
-
-    def test_unknown_empty(self):
-        assert classify_source("") == ("unknown", None)
-
-    def test_ib_with_parenthetical(self):
-        assert classify_source("IB Section 2.3 (Pharmacology/MoA)") == ("ib", "2.3")
-
-    def test_ib_sections_plural(self):
-        assert classify_source("IB Sections 1.2") == ("ib", "1.2")
-
-    def test_ib_table_reference(self):
-        assert classify_source("IB Table 30") == ("ib_table", "30")
-
-    def test_ib_table_case_insensitive(self):
-        assert classify_source("ib table 5") == ("ib_table", "5")
-
-    def test_pbrer_with_parenthetical(self):
-        assert classify_source("PBRER Section 5 (Safety)") == ("pbrer", "5")
-
-    def test_pbrer_sections_plural(self):
-        assert classify_source("PBRER Sections 1.3") == ("pbrer", "1.3")
+    def test_repeat_lookups_are_cached(self):
+        classify_source("IB 7.7.7")
+        hits = classify_source.cache_info().hits
+        assert classify_source("IB 7.7.7") == ("ib", "7.7.7")
+        assert classify_source.cache_info().hits == hits + 1
 
 
 # ---------------------------------------------------------------------------
@@ -122,6 +87,11 @@ class TestExpandCompoundRefs:
     def test_single_ib_ref_unchanged(self):
         assert _expand_compound_refs("IB Section 2.3") == ["IB Section 2.3"]
 
+    def test_result_is_a_fresh_list(self):
+        first = _expand_compound_refs("IB Sections 1.2, 3.2")
+        first.append("mutated")
+        assert _expand_compound_refs("IB Sections 1.2, 3.2") == ["IB Section 1.2", "IB Section 3.2"]
+
     def test_comma_separated_ib_sections(self):
         result = _expand_compound_refs("IB Sections 1.2, 3.2")
         assert result == ["IB Section 1.2", "IB Section 3.2"]
@@ -160,7 +130,7 @@ class TestExpandCompoundRefs:
 class TestResolveSources:
     """Tests for resolve_sources()."""
 
-    @pytest.fixture()
+    @pytest.fixture(scope="module")
     def ib_index(self) -> dict[str, str]:
         return {
             "2.3": "This is the content of IB section 2.3.",
@@ -253,15 +223,15 @@ class TestResolveSources:
 class TestResolveSourcesMultiIndex:
     """Tests for resolve_sources with PBRER and literature indices."""
 
-    @pytest.fixture()
+    @pytest.fixture(scope="module")
     def ib_index(self) -> dict[str, str]:
         return {"2.3": "IB 2.3 content", "6.1": "IB 6.1 content"}
 
-    @pytest.fixture()
+    @pytest.fixture(scope="module")
     def pbrer_index(self) -> dict[str, str]:
         return {"1.3": "PBRER 1.3 content", "5.1.2": "PBRER 5.1.2 content"}
 
-    @pytest.fixture()
+    @pytest.fixture(scope="module")
     def literature_results(self) -> dict[str, str]:
         return {"UpToDate": "UpToDate clinical summary"}
 
@@ -295,6 +265,13 @@ class TestResolveSourcesMultiIndex:
         assert result[0].found is True
         assert result[0].content == "UpToDate clinical summary"
 
+    def test_literature_match_ignores_case_and_keeps_first_key(self, ib_index):
+        literature = {"UpToDate": "first", "uptodate": "second"}
+        result = resolve_sources(["UPTODATE review"], ib_index, literature_results=literature)
+        assert result[0].found is True
+        assert result[0].content == "first"
+        assert list(literature) == ["UpToDate", "uptodate"]
+
     def test_backward_compatible_no_pbrer(self, ib_index):
         """Calling without pbrer_index still works (backward compat)."""
         result = resolve_sources(["PBRER 1.3"], ib_index)
@@ -325,7 +302,7 @@ class TestResolveSourcesMultiIndex:
 class TestCompoundAndTableResolution:
     """Tests for compound ref expansion and IB Table resolution."""
 
-    @pytest.fixture()
+    @pytest.fixture(scope="module")
     def ib_index(self) -> dict[str, str]:
         return {
             "1.2": "Formulation details.",
@@ -367,3 +344,42 @@ class TestCompoundAndTableResolution:
         )
         assert len(result) == 2
         assert all(r.found for r in result)
+
+
+class TestIterResolveSources:
+    """Tests for iter_resolve_sources()."""
+
+    def test_yields_lazily_in_resolve_sources_order(self):
+        ib_index = {"1.2": "Formulation details.", "3.2": "Dosing information."}
+        refs = ["IB Sections 1.2, 3.2", "PBRER Section 5"]
+        it = iter_resolve_sources(iter(refs), ib_index)
+        assert next(it).section_num == "1.2"
+        assert [next(it)] + list(it) == resolve_sources(refs, ib_index)[1:]
+
+
+class TestResolveSourcesBulk:
+    """Tests for resolve_sources_bulk()."""
+
+    @pytest.fixture(scope="module")
+    def ib_index(self) -> dict[str, str]:
+        return {"1.2": "Formulation details.", "3.2": "Dosing information."}
+
+    def test_matches_per_ref_resolution(self, ib_index):
+        refs = ["IB Sections 1.2, 3.2", "IB Section 3.2", "PBRER Section 5", "IB 9.9"]
+        bulk = resolve_sources_bulk(refs, ib_index)
+        assert list(bulk) == refs
+        for ref in refs:
+            assert bulk[ref] == resolve_sources([ref], ib_index)
+
+    def test_shared_ref_resolved_once(self, ib_index):
+        bulk = resolve_sources_bulk(["IB Sections 1.2, 3.2", "IB Section 3.2", "IB Section 3.2"], ib_index)
+        assert len(bulk) == 2
+        assert bulk["IB Section 3.2"][0] is bulk["IB Sections 1.2, 3.2"][1]
+
+    def test_empty(self, ib_index):
+        assert resolve_sources_bulk([], ib_index) == {}
+
+    def test_results_are_immutable(self, ib_index):
+        rs = resolve_sources_bulk(["IB 1.2"], ib_index)["IB 1.2"][0]
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            rs.content = "changed"
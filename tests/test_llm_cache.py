@@ -0,0 +1,88 @@
+"""Tests for llm_cache module."""
+
+from __future__ import annotations
+
+import numpy as np
+
+from src.llm_cache import LLMCache
+
+
+def _embed_by_first_word(text: str) -> np.ndarray:
+    """Toy embedder: prompts whose first words have equal length match."""
+    vec = np.zeros(8, dtype="float32")
+    vec[len(text.split()[0]) % 8] = 1.0
+    return vec
+
+
+class TestExactCache:
+    def test_miss_then_hit(self, tmp_path):
+        cache = LLMCache(tmp_path / "cache.sqlite", model="gpt-4o")
+        assert cache.get("sys", "user") is None
+        cache.set("sys", "user", "response")
+        assert cache.get("sys", "user") == "response"
+
+    def test_key_includes_system_prompt_and_model(self, tmp_path):
+        path = tmp_path / "cache.sqlite"
+        cache = LLMCache(path, model="gpt-4o")
+        cache.set("sys", "user", "response")
+        assert cache.get("other sys", "user") is None
+        assert LLMCache(path, model="gpt-4o-mini").get("sys", "user") is None
+
+    def test_persists_across_instances(self, tmp_path):
+        path = tmp_path / "cache.sqlite"
+        cache = LLMCache(path, model="gpt-4o")
+        cache.set("sys", "user", "response")
+        cache.close()
+        assert LLMCache(path, model="gpt-4o").get("sys", "user") == "response"
+
+
+class TestSemanticCache:
+    def test_similar_prompt_hits(self, tmp_path):
+        cache = LLMCache(tmp_path / "cache.sqlite", model="gpt-4o", embed_fn=_embed_by_first_word)
+        cache.set("sys", "alpha one", "response")
+        assert cache.get("sys", "alpha two") == "response"
+
+    def test_dissimilar_prompt_misses(self, tmp_path):
+        cache = LLMCache(tmp_path / "cache.sqlite", model="gpt-4o", embed_fn=_embed_by_first_word)
+        cache.set("sys", "alpha one", "response")
+        assert cache.get("sys", "beta one") is None
+
+    def test_semantic_hit_scoped_to_system_prompt(self, tmp_path):
+        cache = LLMCache(tmp_path / "cache.sqlite", model="gpt-4o", embed_fn=_embed_by_first_word)
+        cache.set("sys", "alpha one", "response")
+        assert cache.get("other sys", "alpha two") is None
+
+    def test_embeddings_loaded_from_disk(self, tmp_path):
+        path = tmp_path / "cache.sqlite"
+        LLMCache(path, model="gpt-4o", embed_fn=_embed_by_first_word).set("sys", "alpha one", "r")
+        cache = LLMCache(path, model="gpt-4o", embed_fn=_embed_by_first_word)
+        assert cache.get("sys", "alpha two") == "r"
+
+    def test_semantic_hit_scoped_to_section(self, tmp_path):
+        cache = LLMCache(tmp_path / "cache.sqlite", model="gpt-4o", embed_fn=_embed_by_first_word)
+        cache.set("sys", "alpha\nSECTION: 1.1", "response", section_id="1.1")
+        assert cache.get("sys", "alpha\nSECTION: 1.2", section_id="1.2") is None
+        assert cache.get("sys", "alpha\nSECTION: 1.1 (rev)", section_id="1.1") == "response"
+
+    def test_miss_embeds_prompt_once_outside_lock(self, tmp_path):
+        calls: list[bool] = []
+
+        def embed(text: str) -> np.ndarray:
+            calls.append(cache._lock.locked())
+            return _embed_by_first_word(text)
+
+        cache = LLMCache(tmp_path / "cache.sqlite", model="gpt-4o", embed_fn=embed)
+        text, vec = cache.lookup("sys", "alpha one")
+        assert text is None
+        cache.set("sys", "alpha one", "response", embedding=vec)
+        assert calls == [False]
+
+    def test_embedding_failure_falls_back_to_exact(self, tmp_path):
+        def embed(text: str) -> np.ndarray:
+            raise ConnectionError("embeddings down")
+
+        cache = LLMCache(tmp_path / "cache.sqlite", model="gpt-4o", embed_fn=embed)
+        assert cache.lookup("sys", "alpha one") == (None, None)
+        cache.set("sys", "alpha one", "response")
+        assert cache.get("sys", "alpha one") == "response"
+        assert cache.get("sys", "alpha two") is None
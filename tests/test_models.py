@@ -2,20 +2,24 @@
 
 from __future__ import annotations
 
+import pytest
+from pydantic import ValidationError
+
 from src.models import MappingTableEntry, SectionMapping, TemplateSection
+from tests._factories import mapping_entry, template_section
 
 
 class TestTemplateSectionExtensions:
     def test_mapping_table_sources_default_empty(self) -> None:
-        ts = TemplateSection(section_id="1.1", title="Intro")
+        ts = template_section(section_id="1.1", title="Intro")
         assert ts.mapping_table_sources == {}
 
     def test_ignore_default_false(self) -> None:
-        ts = TemplateSection(section_id="1.1", title="Intro")
+        ts = template_section(section_id="1.1", title="Intro")
         assert ts.ignore is False
 
     def test_mapping_table_sources_set(self) -> None:
-        ts = TemplateSection(
+        ts = template_section(
             section_id="1.2.1",
             title="Drug Background",
             mapping_table_sources={"ib": ["IB 2.3"], "pbrer": ["PBRER 1.3"]},
@@ -24,9 +28,14 @@ class TestTemplateSectionExtensions:
         assert ts.mapping_table_sources["pbrer"] == ["PBRER 1.3"]
 
     def test_ignore_set_true(self) -> None:
-        ts = TemplateSection(section_id="99", title="IGNORE", ignore=True)
+        ts = template_section(section_id="99", title="IGNORE", ignore=True)
         assert ts.ignore is True
 
+    def test_section_id_interned(self) -> None:
+        a = TemplateSection(section_id="".join(["2.", "1.4"]), title="A")
+        b = MappingTableEntry(dsr_section_id="".join(["2.1", ".4"]))
+        assert a.section_id is b.dsr_section_id
+
 
 class TestMappingTableEntry:
     def test_basic_construction(self) -> None:
@@ -40,10 +49,15 @@ class TestMappingTableEntry:
         assert len(entry.source_refs) == 2
 
     def test_default_empty_fields(self) -> None:
-        entry = MappingTableEntry(dsr_section_id="1.1")
+        entry = mapping_entry(dsr_section_id="1.1")
         assert entry.dsr_title == ""
         assert entry.source_refs == []
 
+    def test_frozen(self) -> None:
+        entry = MappingTableEntry(dsr_section_id="1.1")
+        with pytest.raises(ValidationError):
+            entry.dsr_title = "Changed"
+
 
 class TestSectionMappingConfidence:
     def test_confidence_default_zero(self) -> None:
@@ -57,3 +71,9 @@ class TestSectionMappingConfidence:
             confidence=0.95,
         )
         assert sm.confidence == 0.95
+
+    def test_frozen_and_hashable(self) -> None:
+        sm = SectionMapping(dsr_section="1.1", dsr_title="Intro")
+        with pytest.raises(ValidationError):
+            sm.confidence = 1.0
+        assert sm in {SectionMapping(dsr_section="1.1", dsr_title="Intro")}
@@ -2,20 +2,21 @@
 
 from __future__ import annotations
 
-from src.models import DSRSection, MappingTableEntry, SectionMapping, TemplateSection
+from src.models import SectionMapping
 from src.section_mapper import _pass_mapping_table
+from tests._factories import dsr_section, mapping_entry, template_section
 
 
 class TestPassMappingTable:
     def test_explicit_mapping(self) -> None:
         dsr = [
-            DSRSection(section_num="1.2.1", title="Drug Background", content="content"),
+            dsr_section(section_num="1.2.1", title="Drug Background", content="content"),
         ]
         tmpl = [
-            TemplateSection(section_id="1.2.1", title="Drug Background"),
+            template_section(section_id="1.2.1", title="Drug Background"),
         ]
         entries = [
-            MappingTableEntry(
+            mapping_entry(
                 dsr_section_id="1.2.1",
                 dsr_title="Drug Background",
                 source_refs=["IB 2.3"],
@@ -30,13 +31,13 @@ class TestPassMappingTable:
 
     def test_no_match_when_template_missing(self) -> None:
         dsr = [
-            DSRSection(section_num="9.9", title="Unknown", content="content"),
+            dsr_section(section_num="9.9", title="Unknown", content="content"),
         ]
         tmpl = [
-            TemplateSection(section_id="1.1", title="Intro"),
+            template_section(section_id="1.1", title="Intro"),
         ]
         entries = [
-            MappingTableEntry(dsr_section_id="9.9", source_refs=["IB 1.0"]),
+            mapping_entry(dsr_section_id="9.9", source_refs=["IB 1.0"]),
         ]
         mappings: dict[str, SectionMapping] = {}
         _pass_mapping_table(dsr, tmpl, entries, mappings)
@@ -45,13 +46,13 @@ class TestPassMappingTable:
 
     def test_already_mapped_skipped(self) -> None:
         dsr = [
-            DSRSection(section_num="1.1", title="Intro", content="content"),
+            dsr_section(section_num="1.1", title="Intro", content="content"),
         ]
         tmpl = [
-            TemplateSection(section_id="1.1", title="Intro"),
+            template_section(section_id="1.1", title="Intro"),
         ]
         entries = [
-            MappingTableEntry(dsr_section_id="1.1", source_refs=["IB 1.0"]),
+            mapping_entry(dsr_section_id="1.1", source_refs=["IB 1.0"]),
         ]
         # Pre-populate with existing mapping
         mappings: dict[str, SectionMapping] = {
@@ -67,16 +68,16 @@ class TestPassMappingTable:
 
     def test_multiple_entries(self) -> None:
         dsr = [
-            DSRSection(section_num="1.2.1", title="Drug Background", content="c1"),
-            DSRSection(section_num="1.2.1.1", title="Therapeutic Indications", content="c2"),
+            dsr_section(section_num="1.2.1", title="Drug Background", content="c1"),
+            dsr_section(section_num="1.2.1.1", title="Therapeutic Indications", content="c2"),
         ]
         tmpl = [
-            TemplateSection(section_id="1.2.1", title="Drug Background"),
-            TemplateSection(section_id="1.2.1.1", title="Therapeutic Indications"),
+            template_section(section_id="1.2.1", title="Drug Background"),
+            template_section(section_id="1.2.1.1", title="Therapeutic Indications"),
         ]
         entries = [
-            MappingTableEntry(dsr_section_id="1.2.1", source_refs=["IB 2.3"]),
-            MappingTableEntry(dsr_section_id="1.2.1.1", source_refs=["IB 6.1", "PBRER 1.3"]),
+            mapping_entry(dsr_section_id="1.2.1", source_refs=["IB 2.3"]),
+            mapping_entry(dsr_section_id="1.2.1.1", source_refs=["IB 6.1", "PBRER 1.3"]),
         ]
         mappings: dict[str, SectionMapping] = {}
         _pass_mapping_table(dsr, tmpl, entries, mappings)
@@ -85,8 +86,8 @@ class TestPassMappingTable:
         assert mappings["1.2.1.1"].match_method == "mapping_table"
 
     def test_empty_entries(self) -> None:
-        dsr = [DSRSection(section_num="1.1", title="Intro", content="c")]
-        tmpl = [TemplateSection(section_id="1.1", title="Intro")]
+        dsr = [dsr_section(section_num="1.1", title="Intro", content="c")]
+        tmpl = [template_section(section_id="1.1", title="Intro")]
         mappings: dict[str, SectionMapping] = {}
         _pass_mapping_table(dsr, tmpl, [], mappings)
         assert len(mappings) == 0
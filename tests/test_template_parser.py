@@ -21,34 +21,13 @@ class TestReadTemplateContent:
         assert "Section 1" in text
         assert tables == []
 
-    def test_docx_file_extracts_paragraphs(self, tmp_path: Path) -> None:
-        from docx import Document
-
-        doc = Document()
-        doc.add_paragraph("1.1 Introduction")
-        doc.add_paragraph("Some body text here")
-        docx_path = tmp_path / "template.docx"
-        doc.save(str(docx_path))
-
-        text, tables = _read_template_content(docx_path)
+    def test_docx_file_extracts_paragraphs(self, sample_docx_content) -> None:
+        text, _ = sample_docx_content
         assert "1.1 Introduction" in text
         assert "Some body text here" in text
 
-    def test_docx_extracts_tables(self, tmp_path: Path) -> None:
-        from docx import Document
-
-        doc = Document()
-        table = doc.add_table(rows=2, cols=3)
-        table.cell(0, 0).text = "DSR Section"
-        table.cell(0, 1).text = "Content"
-        table.cell(0, 2).text = "Source Documents"
-        table.cell(1, 0).text = "1.2.1"
-        table.cell(1, 1).text = "Drug Background"
-        table.cell(1, 2).text = "IB 2.3"
-        docx_path = tmp_path / "template.docx"
-        doc.save(str(docx_path))
-
-        text, tables = _read_template_content(docx_path)
+    def test_docx_extracts_tables(self, sample_docx_content) -> None:
+        _, tables = sample_docx_content
         assert len(tables) == 1
         assert tables[0][0][0] == "DSR Section"
         assert tables[0][1][2] == "IB 2.3"
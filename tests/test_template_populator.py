@@ -2,10 +2,80 @@
 
 from __future__ import annotations
 
+import re
+
 import pytest
+from docx import Document
+from docx.oxml.ns import qn
+from docx.shared import RGBColor
 
 from src.models import TemplateSection
-from src.template_populator import assemble_markdown, _resolve_ib_for_exec
+from src.template_populator import (
+    SYNTHESIS_SYSTEM,
+    _build_synthesis_prompt,
+    _dedup_source_contents,
+    _exec_ib_targets,
+    _fair_token_budgets,
+    _heading_level,
+    _inline_spans,
+    _parse_batch_response,
+    _plan_sections,
+    _resolve_ib_for_exec,
+    assemble_markdown,
+    iter_markdown,
+    write_filled_template,
+)
+
+
+class _FakeLLM:
+    """Stand-in for LLMClient that echoes the call label."""
+
+    concurrency = 10
+
+    def __init__(
+        self,
+        batch_mode: bool = False,
+        fail_labels: tuple[str, ...] = (),
+        sections_per_call: int = 1,
+        garble_groups: bool = False,
+        drop_from_groups: tuple[str, ...] = (),
+    ):
+        self.batch_mode = batch_mode
+        self.fail_labels = fail_labels
+        self.sections_per_call = sections_per_call
+        self.garble_groups = garble_groups
+        self.drop_from_groups = drop_from_groups
+        self.calls: list[str] = []
+        self.cache_flags: list[bool] = []
+        self.batches: list[list[str]] = []
+
+    def call(self, system_prompt, user_prompt, json_mode=True, label="api_call",
+             cache_system_prompt=False):
+        self.calls.append(label)
+        self.cache_flags.append(cache_system_prompt)
+        if label in self.fail_labels:
+            raise RuntimeError("boom")
+        section_ids = re.findall(r"^### QUERY \d+: (\S+) ###$", user_prompt, re.MULTILINE)
+        if section_ids:
+            if self.garble_groups:
+                return "no markers here"
+            return "\n".join(
+                f"<<<SECTION {k}>>>\nGROUPED {sid}\n<<<END {k}>>>"
+                for k, sid in enumerate(section_ids, 1)
+                if sid not in self.drop_from_groups
+            )
+        return f"SYNTH {label}"
+
+    def submit_batch(self, requests):
+        self.batches.append([custom_id for custom_id, _, _ in requests])
+        return f"batch_{len(self.batches)}"
+
+    def wait_batch(self, batch_id):
+        ids = self.batches[int(batch_id.split("_")[1]) - 1]
+        return {
+            cid: f"BATCH {cid}" for cid in ids
+            if not any(cid.endswith(label) for label in self.fail_labels)
+        }
 
 
 class TestAssembleMarkdown:
@@ -35,6 +105,18 @@ class TestAssembleMarkdown:
         assert "Pralsetinib is a kinase inhibitor" in md
         assert "100mg capsules" in md
 
+    def test_raw_source_layout(self):
+        sections = [
+            TemplateSection(section_id="1", title="One", required_sources=["IB 6.1"]),
+            TemplateSection(section_id="2", title="Two", required_sources=["IB 6.1", "IB 3.2"]),
+        ]
+        md = assemble_markdown(sections, self.ib_index)
+        assert (
+            "## 1 One\n\n*Source: IB 6.1*\n\nApproved for RET-positive NSCLC.\n\n\n"
+            "## 2 Two\n\n### From IB 6.1\n\nApproved for RET-positive NSCLC.\n\n"
+            "### From IB 3.2\n\nDetailed formulation: excipients include...\n"
+        ) in md
+
     def test_non_ib_ref_gets_placeholder(self):
         sections = [TemplateSection(section_id="2.1.3", title="Patient exposure", body="", required_sources=["PBRER Section 5"])]
         md = assemble_markdown(sections, self.ib_index)
@@ -47,6 +129,15 @@ class TestAssembleMarkdown:
         assert "## 4 Discussion" in md
         assert "Discuss findings here." in md
 
+    def test_iter_markdown_matches_assembled_document(self):
+        sections = [
+            TemplateSection(section_id="2.1.1", title="Drug Pharmacology", body="", required_sources=["IB 2.3", "IB 1.2"]),
+            TemplateSection(section_id="4", title="Discussion", body="Discuss findings here.", required_sources=[]),
+        ]
+        chunks = list(iter_markdown(sections, self.ib_index))
+        assert len(chunks) > 1
+        assert "".join(chunks) == assemble_markdown(sections, self.ib_index)
+
     def test_ib_ref_not_found(self):
         sections = [TemplateSection(section_id="3.1", title="Review of toxicology data", body="", required_sources=["IB Section 4.3.3"])]
         md = assemble_markdown(sections, self.ib_index)
@@ -72,6 +163,418 @@ class TestAssembleMarkdown:
         assert intro_pos < bg_pos < pharm_pos
 
 
+class TestSynthesis:
+    def setup_method(self):
+        self.ib_index = {"2.3": "Kinase inhibitor.", "6.1": "NSCLC."}
+        self.sections = [
+            TemplateSection(section_id="1.1", title="Product Background", body="Summarize product."),
+            TemplateSection(section_id="2", title="Discussion", body="Discuss."),
+            TemplateSection(section_id="2.1", title="Pharmacology", required_sources=["IB 2.3"]),
+        ]
+
+    def test_each_section_synthesized_in_order(self):
+        llm = _FakeLLM()
+        md = assemble_markdown(self.sections, self.ib_index, llm=llm)
+        # Body sections run concurrently; the exec summary waits for them.
+        assert sorted(llm.calls[:2]) == ["synth_2", "synth_2.1"]
+        assert llm.calls[2:] == ["exec_1.1"]
+        assert all(llm.cache_flags)
+        assert md.index("## 2 Discussion") < md.index("SYNTH synth_2\n") < md.index("SYNTH synth_2.1")
+        assert "SYNTH exec_1.1" in md
+        assert "EXEC_SUMMARY" not in md
+
+    def test_unresolved_sources_skip_synthesis(self):
+        sections = [
+            TemplateSection(section_id="3", title="Exposure", required_sources=["PBRER Section 5"]),
+            TemplateSection(section_id="4", title="Toxicology", required_sources=["IB 9.9", "IB 2.3"]),
+        ]
+        llm = _FakeLLM()
+        md = assemble_markdown(sections, self.ib_index, llm=llm)
+        assert llm.calls == ["synth_4"]
+        assert "## 3 Exposure\n\n*Source: PBRER Section 5*\n\n[ADDITIONAL DATA NEEDED:" in md
+
+    def test_failed_call_falls_back_to_raw_sources(self):
+        llm = _FakeLLM(fail_labels=("synth_2.1",))
+        md = assemble_markdown(self.sections, self.ib_index, llm=llm)
+        assert "*Source: IB 2.3*" in md
+        assert "Kinase inhibitor." in md
+
+    def test_batch_mode_submits_body_then_exec(self):
+        llm = _FakeLLM(batch_mode=True)
+        md = assemble_markdown(self.sections, self.ib_index, llm=llm)
+        assert llm.calls == []
+        assert len(llm.batches) == 2
+        assert [cid.split("_", 1)[1] for cid in llm.batches[0]] == ["synth_2", "synth_2.1"]
+        assert [cid.split("_", 1)[1] for cid in llm.batches[1]] == ["exec_1.1"]
+        assert "BATCH 0001_synth_2.1" in md
+        assert "BATCH 0000_exec_1.1" in md
+
+    def test_missing_batch_result_falls_back(self):
+        llm = _FakeLLM(batch_mode=True, fail_labels=("synth_2",))
+        md = assemble_markdown(self.sections, self.ib_index, llm=llm)
+        assert "Discuss." in md
+
+    def test_concurrent_results_keep_section_order(self):
+        import time
+
+        class _SlowFirstLLM(_FakeLLM):
+            def call(self, system_prompt, user_prompt, json_mode=True, label="api_call",
+                     cache_system_prompt=False):
+                if label == "synth_2":
+                    time.sleep(0.05)
+                return super().call(system_prompt, user_prompt, json_mode, label)
+
+        llm = _SlowFirstLLM()
+        md = assemble_markdown(self.sections, self.ib_index, llm=llm)
+        assert llm.calls[0] == "synth_2.1"
+        assert md.index("## 2 Discussion\n\nSYNTH synth_2\n") < md.index("SYNTH synth_2.1")
+
+    def test_concurrency_one_runs_serially(self):
+        import time
+
+        class _SlowFirstLLM(_FakeLLM):
+            concurrency = 1
+
+            def call(self, system_prompt, user_prompt, json_mode=True, label="api_call",
+                     cache_system_prompt=False):
+                if label == "synth_2":
+                    time.sleep(0.05)
+                return super().call(system_prompt, user_prompt, json_mode, label)
+
+        llm = _SlowFirstLLM()
+        assemble_markdown(self.sections, self.ib_index, llm=llm)
+        assert llm.calls[:2] == ["synth_2", "synth_2.1"]
+
+    def test_jobs_sharing_sources_dispatched_together(self):
+        class _SerialLLM(_FakeLLM):
+            concurrency = 1
+
+        sections = [
+            TemplateSection(section_id="3", title="Efficacy", required_sources=["IB 6.1"]),
+            TemplateSection(section_id="4", title="Mechanism", required_sources=["IB 2.3"]),
+            TemplateSection(section_id="5", title="Indication", required_sources=["IB 6.1"]),
+        ]
+        llm = _SerialLLM()
+        md = assemble_markdown(sections, self.ib_index, llm=llm)
+        assert llm.calls == ["synth_4", "synth_3", "synth_5"]
+        assert md.index("SYNTH synth_3") < md.index("SYNTH synth_4") < md.index("SYNTH synth_5")
+
+    def test_sections_grouped_into_one_call(self):
+        llm = _FakeLLM(sections_per_call=5)
+        md = assemble_markdown(self.sections, self.ib_index, llm=llm)
+        assert llm.calls == ["synth_2__2.1", "exec_1.1"]
+        assert md.index("GROUPED 2\n") < md.index("GROUPED 2.1")
+        assert "### 2.1 Pharmacology\n\nGROUPED 2.1\n" in md
+
+    def test_only_missing_sections_retried(self):
+        llm = _FakeLLM(sections_per_call=5, drop_from_groups=("2.1",))
+        md = assemble_markdown(self.sections, self.ib_index, llm=llm)
+        assert llm.calls == ["synth_2__2.1", "synth_2.1", "exec_1.1"]
+        assert "GROUPED 2\n" in md
+        assert "SYNTH synth_2.1" in md
+
+    def test_unparseable_group_retried_per_section(self):
+        llm = _FakeLLM(sections_per_call=5, garble_groups=True)
+        md = assemble_markdown(self.sections, self.ib_index, llm=llm)
+        assert llm.calls == ["synth_2__2.1", "synth_2", "synth_2.1", "exec_1.1"]
+        assert "SYNTH synth_2.1" in md
+        assert "no markers here" not in md
+
+
+class TestSynthesisCache:
+    def test_cached_responses_skip_llm(self, tmp_path):
+        from src.llm_cache import LLMCache
+
+        ib_index = {"2.3": "Kinase inhibitor."}
+        sections = [
+            TemplateSection(section_id="2", title="Discussion", body="Discuss."),
+            TemplateSection(section_id="2.1", title="Pharmacology", required_sources=["IB 2.3"]),
+        ]
+        first = _FakeLLM()
+        first.cache = LLMCache(tmp_path / "cache.sqlite", model="gpt-4o")
+        md_first = assemble_markdown(sections, ib_index, llm=first)
+        assert sorted(first.calls) == ["synth_2", "synth_2.1"]
+
+        second = _FakeLLM()
+        second.cache = first.cache
+        assert assemble_markdown(sections, ib_index, llm=second) == md_first
+        assert second.calls == []
+
+    def test_failed_calls_not_cached(self, tmp_path):
+        from src.llm_cache import LLMCache
+
+        sections = [TemplateSection(section_id="2", title="Discussion", body="Discuss.")]
+        cache = LLMCache(tmp_path / "cache.sqlite", model="gpt-4o")
+        failing = _FakeLLM(fail_labels=("synth_2",))
+        failing.cache = cache
+        assemble_markdown(sections, {}, llm=failing)
+
+        retry = _FakeLLM()
+        retry.cache = cache
+        assert "SYNTH synth_2" in assemble_markdown(sections, {}, llm=retry)
+        assert retry.calls == ["synth_2"]
+
+    def test_embedding_outage_does_not_abort_report(self, tmp_path):
+        from src.llm_cache import LLMCache
+
+        def embed(text):
+            raise ConnectionError("embeddings down")
+
+        sections = [TemplateSection(section_id="2", title="Discussion", body="Discuss.")]
+        llm = _FakeLLM()
+        llm.cache = LLMCache(tmp_path / "cache.sqlite", model="gpt-4o", embed_fn=embed)
+        assert "SYNTH synth_2" in assemble_markdown(sections, {}, llm=llm)
+
+        # The response was still stored for exact lookups
+        rerun = _FakeLLM()
+        rerun.cache = llm.cache
+        assemble_markdown(sections, {}, llm=rerun)
+        assert rerun.calls == []
+
+
+    def test_rerun_with_unchanged_inputs_makes_no_calls(self, tmp_path):
+        from src.llm_cache import LLMCache
+
+        ib_index = {"2.3": "Kinase inhibitor.", "6.1": "NSCLC."}
+        sections = [
+            TemplateSection(section_id="1.1", title="Product Background", body="Summarize."),
+            TemplateSection(section_id="2.1", title="Pharmacology", required_sources=["IB 2.3"]),
+        ]
+        cache = LLMCache(tmp_path / "cache.sqlite", model="gpt-4o")
+        first = _FakeLLM()
+        first.cache = cache
+        paths = write_filled_template(sections, ib_index, tmp_path / "out", llm=first, emit_docx=False)
+        md_first = paths["md"].read_text(encoding="utf-8")
+
+        second = _FakeLLM()
+        second.cache = cache
+        paths = write_filled_template(sections, ib_index, tmp_path / "out", llm=second, emit_docx=False)
+        assert second.calls == []
+        assert paths["md"].read_text(encoding="utf-8") == md_first
+
+        # A changed source invalidates only the section that cites it
+        third = _FakeLLM()
+        third.cache = cache
+        assemble_markdown(sections, {**ib_index, "2.3": "Updated."}, llm=third)
+        assert third.calls[0] == "synth_2.1"
+
+    def test_use_cache_false_bypasses_cache(self, tmp_path):
+        from src.llm_cache import LLMCache
+
+        sections = [TemplateSection(section_id="2", title="Discussion", body="Discuss.")]
+        cache = LLMCache(tmp_path / "cache.sqlite", model="gpt-4o")
+        cache.set(SYNTHESIS_SYSTEM, _build_synthesis_prompt(sections[0], []), "CACHED")
+        llm = _FakeLLM()
+        llm.cache = cache
+        md = assemble_markdown(sections, {}, llm=llm, use_cache=False)
+        assert "CACHED" not in md
+        assert llm.calls == ["synth_2"]
+
+
+class TestParseBatchResponse:
+    def test_splits_on_markers(self):
+        text = "<<<SECTION 1>>>\nFirst.\n<<<END 1>>>\n\n<<<SECTION 2>>>\nSecond\nline.\n<<<END 2>>>\n"
+        assert _parse_batch_response(text, 2) == ["First.", "Second\nline."]
+
+    def test_missing_section_is_none(self):
+        assert _parse_batch_response("<<<SECTION 1>>>\nOnly one.\n<<<END 1>>>", 2) == ["Only one.", None]
+
+    def test_unterminated_section_is_none(self):
+        text = "<<<SECTION 1>>>\nA\n<<<END 1>>>\n<<<SECTION 2>>>\nCut off"
+        assert _parse_batch_response(text, 2) == ["A", None]
+
+    def test_out_of_order_sections_matched_by_number(self):
+        text = "<<<SECTION 2>>>\nB\n<<<END 2>>>\n<<<SECTION 1>>>\nA\n<<<END 1>>>"
+        assert _parse_batch_response(text, 2) == ["A", "B"]
+
+    def test_mismatched_end_marker_not_accepted(self):
+        text = "<<<SECTION 1>>>\nA\n<<<END 2>>>"
+        assert _parse_batch_response(text, 2) == [None, None]
+
+
+class TestInlineSpans:
+    @pytest.mark.parametrize("text, expected", [
+        ("plain text", [("plain", "plain text")]),
+        ("a **bold** b", [("plain", "a "), ("bold", "bold"), ("plain", " b")]),
+        ("*it* and **b**", [("italic", "it"), ("plain", " and "), ("bold", "b")]),
+        ("5 * 3 = 15", [("plain", "5 * 3 = 15")]),
+        ("unterminated **bold", [("plain", "unterminated **bold")]),
+        ("empty ** here", [("plain", "empty ** here")]),
+        ("**a*b**", [("plain", "*"), ("italic", "a"), ("plain", "b**")]),
+    ])
+    def test_spans(self, text, expected):
+        assert _inline_spans(text) == expected
+
+
+class TestWriteFilledTemplate:
+    def test_streamed_md_matches_assembled_markdown(self, tmp_path):
+        ib_index = {"2.3": "Kinase inhibitor targeting RET."}
+        sections = [
+            TemplateSection(section_id="1", title="Introduction", body="Intro text."),
+            TemplateSection(section_id="2.1", title="Pharmacology", required_sources=["IB 2.3"]),
+        ]
+        paths = write_filled_template(sections, ib_index, tmp_path)
+        assert paths["md"].read_text(encoding="utf-8") == assemble_markdown(sections, ib_index)
+        assert paths["docx"].exists()
+
+    def test_emit_docx_false_writes_markdown_only(self, tmp_path):
+        sections = [TemplateSection(section_id="1", title="Introduction", body="Intro.")]
+        paths = write_filled_template(sections, {}, tmp_path, emit_docx=False)
+        assert set(paths) == {"md"}
+        assert not (tmp_path / "filled_template.docx").exists()
+
+    def test_pandoc_missing_falls_back_to_python_docx(self, tmp_path, monkeypatch):
+        import subprocess
+
+        def _no_pandoc(*args, **kwargs):
+            raise FileNotFoundError("pandoc")
+
+        monkeypatch.setattr(subprocess, "run", _no_pandoc)
+        sections = [TemplateSection(section_id="1", title="Introduction", body="Intro.")]
+        paths = write_filled_template(sections, {}, tmp_path, docx_engine="pandoc")
+        assert paths["docx"].exists()
+
+    def test_heading_styles_use_report_font_and_colour(self, tmp_path):
+        sections = [TemplateSection(section_id="1", title="Introduction", body="Intro.")]
+        paths = write_filled_template(sections, {}, tmp_path)
+        doc = Document(str(paths["docx"]))
+        for level in range(1, 5):
+            font = doc.styles[f"Heading {level}"].font
+            assert font.name == "Calibri"
+            assert font.color.rgb == RGBColor(0x1F, 0x3A, 0x5F)
+
+    def test_field_codes_are_inserted(self, tmp_path):
+        sections = [TemplateSection(section_id="1", title="Introduction", body="Intro.")]
+        paths = write_filled_template(sections, {}, tmp_path)
+        doc = Document(str(paths["docx"]))
+        body_codes = [el.text for el in doc.element.body.iter(qn("w:instrText"))]
+        assert any(code.startswith("TOC ") for code in body_codes)
+        footer = doc.sections[0].footer._element
+        footer_codes = [el.text.strip() for el in footer.iter(qn("w:instrText"))]
+        assert "PAGE" in footer_codes
+
+
+class TestSourceDedup:
+    def test_identical_content_merged_under_combined_label(self):
+        merged = _dedup_source_contents([
+            ("IB 2.3", "Same text."),
+            ("IB 6.1", "Other text."),
+            ("IB Section 2.3", "Same text."),
+        ])
+        assert merged == [
+            ("IB 2.3, IB Section 2.3", "Same text."),
+            ("IB 6.1", "Other text."),
+        ]
+
+    def test_prompt_contains_duplicate_content_once(self):
+        section = TemplateSection(section_id="2.1", title="Background")
+        prompt = _build_synthesis_prompt(
+            section,
+            [("IB 2.3", "Kinase inhibitor."), ("IB Section 2.3", "Kinase inhibitor.")],
+        )
+        assert prompt.count("Kinase inhibitor.") == 1
+        assert "--- IB 2.3, IB Section 2.3 ---" in prompt
+
+    def test_shared_ref_across_sections_resolved_for_each(self):
+        ib_index = {"2.3": "Shared IB content."}
+        sections = [
+            TemplateSection(section_id="2.1", title="A", required_sources=["IB 2.3"]),
+            TemplateSection(section_id="3.1", title="B", required_sources=["IB 2.3"]),
+        ]
+        md = assemble_markdown(sections, ib_index)
+        assert md.count("Shared IB content.") == 2
+
+
+class TestSynthesisPromptOrder:
+    def test_section_line_last_and_sources_first(self):
+        section = TemplateSection(section_id="2.1", title="Pharmacology", body="Summarize.")
+        prompt = _build_synthesis_prompt(section, [("IB 2.3", "Kinase inhibitor.")])
+        assert prompt.startswith("SOURCE MATERIAL:")
+        assert prompt.index("Kinase inhibitor.") < prompt.index("Summarize.")
+        assert prompt.endswith("SECTION: 2.1 — Pharmacology")
+
+    def test_sections_sharing_sources_share_prefix(self):
+        sources = [("IB 2.3", "Kinase inhibitor.")]
+        a = _build_synthesis_prompt(
+            TemplateSection(section_id="2.1", title="A", body="Do A."), sources,
+        )
+        b = _build_synthesis_prompt(
+            TemplateSection(section_id="3.1", title="B", body="Do B."), sources,
+        )
+        prefix = "SOURCE MATERIAL:\n\n--- IB 2.3 ---\nKinase inhibitor.\n"
+        assert a.startswith(prefix) and b.startswith(prefix)
+
+
+class TestHeadingLevel:
+    @pytest.mark.parametrize("section_id, level", [
+        ("1", 2),
+        ("2.1", 3),
+        ("2.1.1", 4),
+        ("1.2.3.4.5.6", 6),
+        (" 3.1 ", 3),
+        ("Executive Summary", 2),
+        ("1.", 2),
+        ("A.1", 2),
+    ])
+    def test_level(self, section_id, level):
+        assert _heading_level(section_id) == level
+
+
+class _WordEncoder:
+    """Tokenizer double: one token per space-separated word."""
+
+    def encode(self, text):
+        return text.split(" ") if text else []
+
+    def decode(self, tokens):
+        return " ".join(tokens)
+
+
+class TestSourceTruncation:
+    def test_fair_budgets_give_short_sources_their_length(self):
+        assert _fair_token_budgets([10, 100, 1000], 300) == [10, 100, 190]
+        assert _fair_token_budgets([500, 500], 300) == [150, 150]
+        assert _fair_token_budgets([], 300) == []
+
+    def test_token_truncation_shares_budget(self, monkeypatch):
+        import src.template_populator as tp
+
+        monkeypatch.setattr(tp, "_get_encoder", lambda: _WordEncoder())
+        monkeypatch.setattr(tp, "_SOURCE_TOKEN_BUDGET", 10)
+        section = TemplateSection(section_id="2.1", title="Pharmacology")
+        long_text = " ".join(f"w{i}" for i in range(50))
+        prompt = _build_synthesis_prompt(section, [("IB 2.3", "short text"), ("IB 6.1", long_text)])
+        assert "short text" in prompt
+        assert " ".join(f"w{i}" for i in range(8)) + "\n[... content truncated" in prompt
+        assert "w8" not in prompt
+
+    def test_char_fallback_without_tokenizer(self, monkeypatch):
+        import src.template_populator as tp
+
+        monkeypatch.setattr(tp, "_get_encoder", lambda: None)
+        section = TemplateSection(section_id="2.1", title="Pharmacology")
+        prompt = _build_synthesis_prompt(section, [("IB 2.3", "x" * 13000)])
+        assert "x" * 12000 + "\n[... content truncated" in prompt
+        assert "x" * 12001 not in prompt
+
+
+class TestPlanSections:
+    def test_child_without_sources_skipped_under_parent(self):
+        sections = [
+            TemplateSection(section_id="3", title="Results"),
+            TemplateSection(section_id="3.1", title="Sub"),
+            TemplateSection(section_id="3.2", title="Sourced", required_sources=["IB 2.3"]),
+        ]
+        plans = _plan_sections(sections, use_synthesis=False)
+        assert [p.skip for p in plans] == [False, True, False]
+        assert plans[1].heading == "### 3.1 Sub"
+
+    def test_exec_summary_deferred_only_when_synthesizing(self):
+        sections = [TemplateSection(section_id="1.1", title="Rationale")]
+        assert _plan_sections(sections, use_synthesis=True)[0].is_exec_summary
+        assert not _plan_sections(sections, use_synthesis=False)[0].is_exec_summary
+
+
 class TestResolveIbForExec:
     """Test the IB section resolution for Executive Summary subsections."""
 
@@ -169,6 +672,25 @@ class TestResolveIbForExec:
         labels = [label for label, _ in results]
         assert any("Table 30" in l for l in labels), f"Expected Table 30, got {labels}"
 
+    def test_keyword_matching_is_memoized_per_text(self):
+        _resolve_ib_for_exec("Patient Exposure", "Memo check.", self.ib_index)
+        hits = _exec_ib_targets.cache_info().hits
+        results = _resolve_ib_for_exec("Patient Exposure", "Memo check.", {"5.5": "Other IB."})
+        assert _exec_ib_targets.cache_info().hits == hits + 1
+        # Only the keyword match is cached; content comes from the index passed in.
+        assert results == [("IB Section 5.5", "Other IB.")]
+
+    def test_repeated_table_reference_pulled_once(self):
+        # Both keyword groups map to 5.5; the body cites Table 30 twice.
+        ib_index = {"5.5": "Clinical results including Table 30 data."}
+        results = _resolve_ib_for_exec(
+            "Key Results and Patient Exposure",
+            "Table 30 shows exposure; see also Table 30.",
+            ib_index,
+        )
+        labels = [label for label, _ in results]
+        assert labels == ["IB Section 5.5", "IB Table 30"]
+
     def test_no_duplicates_in_results(self):
         results = _resolve_ib_for_exec(
             "Data Sources and Key Results",
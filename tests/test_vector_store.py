@@ -2,11 +2,17 @@
 
 from __future__ import annotations
 
+import json
 from pathlib import Path
+from types import SimpleNamespace
 
+import faiss
 import numpy as np
 import pytest
+from openai import APIConnectionError
+from tenacity import wait_none
 
+from src import vector_store
 from src.config import Config
 from src.vector_store import VectorStore
 
@@ -77,10 +83,77 @@ class TestVectorStore:
         assert loaded is True
         assert store2.index.ntotal == 3
         assert len(store2.metadata) == 3
+        assert store2.metadata[1] == {"n": 2, "source_type": "test"}
+
+    def test_filter_returns_k_from_minority_source(self, store: VectorStore) -> None:
+        store.add_documents([f"ib {n}" for n in range(20)], [{}] * 20, source_type="ib")
+        store.add_documents(["t1", "t2"], [{"id": 1}, {"id": 2}], source_type="template")
+        results = store.search("t", k=2, filter_source="template")
+        assert sorted(r["metadata"]["id"] for r in results) == [1, 2]
+
+    def test_filter_on_interleaved_source_ids(self, store: VectorStore) -> None:
+        store.flush_threshold = 1
+        for n in range(6):
+            store.add_documents([f"doc {n}"], [{"n": n}], source_type="ib" if n % 2 else "template")
+        results = store.search("doc", k=6, filter_source="ib")
+        assert sorted(r["metadata"]["n"] for r in results) == [1, 3, 5]
+
+    def test_id_selector_uses_range_for_contiguous_ids(self) -> None:
+        assert isinstance(vector_store._id_selector([3, 4, 5]), faiss.IDSelectorRange)
+        assert isinstance(vector_store._id_selector([1, 3, 5]), faiss.IDSelectorBatch)
+
+    def test_filter_on_unknown_source_returns_nothing(self, store: VectorStore) -> None:
+        store.add_documents(["a"], [{}], source_type="ib")
+        assert store.search("a", filter_source="template") == []
+
+    def test_source_ids_survive_save_and_load(
+        self, store: VectorStore, dry_run_config: Config
+    ) -> None:
+        store.add_documents(["a", "b"], [{}, {}], source_type="ib")
+        store.add_documents(["c"], [{}], source_type="template")
+        store.save("ids")
+        store2 = VectorStore(dry_run_config)
+        store2.load("ids")
+        assert store2._ids_by_source == {"ib": [0, 1], "template": [2]}
+
+    def test_msgpack_metadata_round_trip(
+        self, store: VectorStore, dry_run_config: Config
+    ) -> None:
+        pytest.importorskip("msgpack")
+        store.add_documents(["a"], [{"n": 1}], source_type="test")
+        store.save("packed")
+        assert (dry_run_config.vector_index_dir / "packed.meta.msgpack").exists()
+        store2 = VectorStore(dry_run_config)
+        assert store2.load("packed") is True
+        assert store2.metadata[0] == {"n": 1, "source_type": "test"}
+
+    def test_loaded_index_is_read_only(self, store: VectorStore, dry_run_config: Config) -> None:
+        store.add_documents(["a"], [{}], source_type="test")
+        store.save("ro")
+        store2 = VectorStore(dry_run_config)
+        store2.load("ro")
+        with pytest.raises(RuntimeError, match="memory-mapped"):
+            store2.add_documents(["b"], [{}], source_type="test")
 
     def test_load_nonexistent_returns_false(self, store: VectorStore) -> None:
         assert store.load("nonexistent") is False
 
+    def test_failed_load_leaves_store_unchanged(
+        self, store: VectorStore, dry_run_config: Config
+    ) -> None:
+        store.add_documents(["a"], [{"n": 1}], source_type="test")
+        store.save("t")
+        for idx_file in dry_run_config.vector_index_dir.glob("t.idx.*"):
+            idx_file.unlink()
+
+        store2 = VectorStore(dry_run_config)
+        store2.add_documents(["b"], [{"n": 2}], source_type="test")
+        assert store2.load("t") is False
+        store2.add_documents(["c"], [{"n": 3}], source_type="test")
+        store2.flush()
+        assert store2.index.ntotal == 2
+        assert [m["n"] for m in store2.metadata] == [2, 3]
+
     def test_metadata_length_mismatch_raises(self, store: VectorStore) -> None:
         with pytest.raises(ValueError, match="same length"):
             store.add_documents(
@@ -93,6 +166,91 @@ class TestVectorStore:
         store.add_documents(texts=[], metadata=[], source_type="test")
         assert store.index.ntotal == 0
 
+    def test_small_adds_share_one_embedding_request(self, store: VectorStore) -> None:
+        calls: list[int] = []
+        embed = store._get_embeddings
+        store._get_embeddings = lambda texts: calls.append(len(texts)) or embed(texts)
+        store.add_documents(["a"], [{"id": "1"}], source_type="ib")
+        store.add_documents(["b", "c"], [{"id": "2"}, {"id": "3"}], source_type="template")
+        assert store.index.ntotal == 0
+        store.flush()
+        assert calls == [3]
+        assert store.index.ntotal == 3
+        assert [m["source_type"] for m in store.metadata] == ["ib", "template", "template"]
+
+    def test_threshold_triggers_flush(self, store: VectorStore) -> None:
+        store.flush_threshold = 2
+        store.add_documents(["a", "b"], [{}, {}], source_type="test")
+        assert store.index.ntotal == 2
+
+    def test_save_flushes_pending(self, store: VectorStore, dry_run_config: Config) -> None:
+        store.add_documents(["a"], [{"n": 1}], source_type="test")
+        store.save("pending")
+        store2 = VectorStore(dry_run_config)
+        assert store2.load("pending") is True
+        assert store2.index.ntotal == 1
+
+    def test_default_index_is_exact_flat(self, store: VectorStore) -> None:
+        assert isinstance(store.index, faiss.IndexFlatIP)
+        assert store.index.metric_type == faiss.METRIC_INNER_PRODUCT
+
+    def test_index_classes(self, store: VectorStore, dry_run_config: Config) -> None:
+        assert isinstance(store._new_index(quantize=True), faiss.IndexScalarQuantizer)
+        dry_run_config.ann_index_type = "hnsw"
+        assert isinstance(store._new_index(quantize=True), faiss.IndexHNSWSQ)
+        assert isinstance(store._new_index(quantize=False), faiss.IndexHNSWFlat)
+
+    def test_dry_run_embeddings_depend_only_on_text(self, store: VectorStore) -> None:
+        both = store._get_embeddings(["x", "y"])
+        np.testing.assert_array_equal(both[1], store._get_embeddings(["y"])[0])
+        assert not np.array_equal(both[0], both[1])
+        assert np.linalg.norm(both, axis=1) == pytest.approx([1.0, 1.0])
+
+    def test_small_flush_stays_full_precision(self, store: VectorStore) -> None:
+        store.add_documents(["a", "b", "c"], [{}, {}, {}], source_type="test")
+        store.flush()
+        assert isinstance(store.index, faiss.IndexFlatIP)
+        assert store.index.ntotal == 3
+
+    @pytest.mark.parametrize("ann_index_type", ["flat", "hnsw"])
+    def test_recall_after_small_first_flush(
+        self, dry_run_config: Config, monkeypatch: pytest.MonkeyPatch, ann_index_type: str,
+    ) -> None:
+        # Regression: the quantizer used to be trained on the first flush,
+        # so one vector set the value range and later ones were clamped.
+        monkeypatch.setattr(vector_store, "_SQ_MIN_TRAIN", 100)
+        dry_run_config.ann_index_type = ann_index_type
+        store = VectorStore(dry_run_config)
+        store.add_documents(["doc 0"], [{"n": 0}], source_type="test")
+        store.flush()
+        texts = [f"doc {n}" for n in range(1, 200)]
+        store.add_documents(texts, [{"n": n} for n in range(1, 200)], source_type="test")
+        store.flush()
+        assert store.index.ntotal == 200
+        assert not isinstance(store.index, (faiss.IndexFlatIP, faiss.IndexHNSWFlat))
+
+        hits = store.search_many([f"doc {n}" for n in range(200)], k=1)
+        recall = sum(h[0]["metadata"]["n"] == n for n, h in enumerate(hits)) / 200
+        assert recall >= 0.95
+
+    def test_unknown_index_type_raises(self, dry_run_config: Config) -> None:
+        dry_run_config.ann_index_type = "ivf"
+        with pytest.raises(ValueError, match="ann_index_type"):
+            VectorStore(dry_run_config)
+
+    def test_hnsw_survives_save_and_load(self, dry_run_config: Config) -> None:
+        dry_run_config.ann_index_type = "hnsw"
+        store = VectorStore(dry_run_config)
+        store.add_documents(["a", "b"], [{"n": 1}, {"n": 2}], source_type="test")
+        store.save("hnsw")
+        store2 = VectorStore(dry_run_config)
+        store2.load("hnsw")
+        assert isinstance(store2.index, faiss.IndexHNSW)
+        # Dry-run embeddings are seeded per text, so a query equal to a document matches it.
+        hit = store2.search("b", k=1)[0]
+        assert hit["score"] == pytest.approx(1.0, abs=0.02)
+        assert hit["metadata"]["n"] == 2
+
     def test_content_hash(self) -> None:
         h1 = VectorStore.content_hash(["a", "b"])
         h2 = VectorStore.content_hash(["a", "b"])
@@ -100,3 +258,157 @@ class TestVectorStore:
         assert h1 == h2
         assert h1 != h3
         assert len(h1) == 16
+        assert VectorStore.content_hash(["a\nb"]) != h1
+        assert VectorStore.content_hash(["ab"]) != h1
+
+
+class _FakeBatchClient:
+    """Minimal OpenAI client stand-in for the embeddings Batch API."""
+
+    def __init__(self, dim: int, drop: tuple[str, ...] = ()):
+        self.dim = dim
+        self.drop = drop
+        self.requests: list[dict] = []
+        self.sync_inputs: list[list[str]] = []
+        self.files = self
+        self.batches = self
+        self.embeddings = self
+
+    def _vec(self, text: str) -> list[float]:
+        vec = [0.0] * self.dim
+        vec[len(text) % self.dim] = 1.0
+        return vec
+
+    # files
+    def create(self, file=None, purpose=None, input_file_id=None, endpoint=None,
+               completion_window=None, input=None, model=None):
+        if purpose == "batch":
+            self.requests = [json.loads(line) for line in file.getvalue().decode().splitlines()]
+            return SimpleNamespace(id="file_1")
+        if endpoint is not None:
+            return SimpleNamespace(id="batch_1")
+        self.sync_inputs.append(input)
+        return SimpleNamespace(data=[SimpleNamespace(embedding=self._vec(t)) for t in input])
+
+    def retrieve(self, batch_id):
+        return SimpleNamespace(status="completed", output_file_id="out_1")
+
+    def content(self, file_id):
+        lines = []
+        for req in self.requests:
+            if req["custom_id"] in self.drop:
+                continue
+            data = [
+                {"index": i, "embedding": self._vec(t)}
+                for i, t in enumerate(req["body"]["input"])
+            ]
+            lines.append(json.dumps({
+                "custom_id": req["custom_id"],
+                "response": {"status_code": 200, "body": {"data": data[::-1]}},
+            }))
+        return SimpleNamespace(text="\n".join(lines))
+
+
+class TestEmbeddingBatch:
+    def _store(self, tmp_path: Path, client: _FakeBatchClient) -> VectorStore:
+        config = Config(
+            vector_index_dir=tmp_path / "vectors",
+            embedding_dim=8,
+            embedding_batch_mode=True,
+        )
+        return VectorStore(config, openai_client=client)
+
+    def test_embeddings_reassembled_in_order(self, tmp_path: Path) -> None:
+        client = _FakeBatchClient(dim=8)
+        store = self._store(tmp_path, client)
+        texts = ["x" * n for n in range(1, 151)]
+        vecs = store._get_embeddings(texts)
+        assert [r["custom_id"] for r in client.requests] == ["emb_00000", "emb_00001"]
+        assert client.requests[0]["url"] == "/v1/embeddings"
+        assert [int(np.argmax(v)) for v in vecs] == [len(t) % 8 for t in texts]
+        assert client.sync_inputs == []
+        assert not (tmp_path / "vectors" / "embedding_batch.json").exists()
+
+    def test_repeat_texts_served_from_disk_cache(self, tmp_path: Path) -> None:
+        client = _FakeBatchClient(dim=8)
+        first = self._store(tmp_path, client)._get_embeddings(["a", "bb"])
+        client.requests = []
+        client2 = _FakeBatchClient(dim=8)
+        again = self._store(tmp_path, client2)._get_embeddings(["bb", "ccc", "a"])
+        assert [len(r["body"]["input"]) for r in client2.requests] == [1]
+        np.testing.assert_array_equal(again[0], first[1])
+        np.testing.assert_array_equal(again[2], first[0])
+
+    def test_missing_request_embedded_synchronously(self, tmp_path: Path) -> None:
+        client = _FakeBatchClient(dim=8, drop=("emb_00001",))
+        store = self._store(tmp_path, client)
+        texts = [f"t{n}" for n in range(120)]
+        vecs = store._get_embeddings(texts)
+        assert vecs.shape == (120, 8)
+        assert client.sync_inputs == [texts[100:]]
+
+    def test_sync_path_uses_injected_client(self, tmp_path: Path) -> None:
+        client = _FakeBatchClient(dim=8)
+        config = Config(vector_index_dir=tmp_path / "vectors", embedding_dim=8)
+        store = VectorStore(config, openai_client=client)
+        vecs = store._get_embeddings(["a", "bb"])
+        assert client.sync_inputs == [["a", "bb"]]
+        assert [int(np.argmax(v)) for v in vecs] == [1, 2]
+
+    def test_repeated_texts_embedded_once_per_call(self, tmp_path: Path) -> None:
+        client = _FakeBatchClient(dim=8)
+        config = Config(vector_index_dir=tmp_path / "vectors", embedding_dim=8, embedding_cache=False)
+        store = VectorStore(config, openai_client=client)
+        vecs = store._get_embeddings(["a", "bb", "a", "bb", "a"])
+        assert client.sync_inputs == [["a", "bb"]]
+        assert [int(np.argmax(v)) for v in vecs] == [1, 2, 1, 2, 1]
+
+    def test_search_many_matches_single_searches(self, tmp_path: Path) -> None:
+        client = _FakeBatchClient(dim=8)
+        config = Config(vector_index_dir=tmp_path / "vectors", embedding_dim=8, embedding_cache=False)
+        store = VectorStore(config, openai_client=client)
+        store.add_documents(["a", "bb", "ccc"], [{"n": 1}, {"n": 2}, {"n": 3}], source_type="ib")
+        store.add_documents(["dddd"], [{"n": 4}], source_type="template")
+        store.flush()
+        queries = ["x", "yyy", "zzzz"]
+        client.sync_inputs = []
+        batched = store.search_many(queries, k=2, filter_source="ib")
+        assert client.sync_inputs == [queries]
+        assert batched == [store.search(q, k=2, filter_source="ib") for q in queries]
+        assert batched[1][0]["metadata"]["n"] == 3
+
+    def test_search_many_without_hits(self, tmp_path: Path) -> None:
+        store = VectorStore(Config(dry_run=True, vector_index_dir=tmp_path, embedding_dim=8))
+        assert store.search_many([]) == []
+        assert store.search_many(["a", "b"]) == [[], []]
+
+    def test_search_raw_returns_score_and_id_arrays(self, tmp_path: Path) -> None:
+        client = _FakeBatchClient(dim=8)
+        config = Config(vector_index_dir=tmp_path / "vectors", embedding_dim=8, embedding_cache=False)
+        store = VectorStore(config, openai_client=client)
+        store.add_documents(["a", "bb", "ccc"], [{}, {}, {}], source_type="ib")
+        scores, ids = store.search_raw(["yyy", "z"], k=2)
+        assert scores.shape == ids.shape == (2, 2)
+        assert ids[:, 0].tolist() == [2, 0]
+        assert scores[0, 0] == pytest.approx(1.0, abs=0.02)
+        empty_scores, empty_ids = store.search_raw(["q"], filter_source="template")
+        assert empty_scores.shape == empty_ids.shape == (1, 0)
+
+    def test_transient_embedding_errors_are_retried(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(vector_store._create_embeddings.retry, "wait", wait_none())
+        client = _FakeBatchClient(dim=8)
+        create = client.create
+        failures = [APIConnectionError(request=None)]
+
+        def flaky_create(**kwargs):
+            if failures:
+                raise failures.pop()
+            return create(**kwargs)
+
+        client.create = flaky_create
+        config = Config(vector_index_dir=tmp_path / "vectors", embedding_dim=8)
+        vecs = VectorStore(config, openai_client=client)._get_embeddings(["a"])
+        assert vecs.shape == (1, 8)
+        assert client.sync_inputs == [["a"]]